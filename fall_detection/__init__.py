@@ -13,6 +13,7 @@ Individual components (use directly only if you need fine-grained control):
 PoseEstimator       — MediaPipe pose wrapper
 FeatureEngineer     — sliding-window feature extraction for the RF model
 FallClassifier      — random-forest classifier with confirmation windowing
+BatchedFallClassifier — one model call per tick for several camera streams
 NearFallDetector    — rules-based near-fall / sitting disambiguation
 
 Typical usage
@@ -42,7 +43,7 @@ Typical usage
 from .pipeline          import DetectionPipeline, FrameResult
 from .pose_estimator    import PoseEstimator
 from .feature_engineer  import FeatureEngineer
-from .fall_classifier   import FallClassifier
+from .fall_classifier   import FallClassifier, BatchedFallClassifier
 from .near_fall_detector import NearFallDetector
 from .event_logger import EventLogger
 
@@ -52,6 +53,7 @@ __all__ = [
     'PoseEstimator',
     'FeatureEngineer',
     'FallClassifier',
+    'BatchedFallClassifier',
     'NearFallDetector',
     'EventLogger'
 ]
@@ -1,7 +1,9 @@
 import cv2
 import os
+import queue
+import threading
+import numpy as np
 from pathlib import Path
-from collections import deque
 from datetime import datetime
 
 # How many seconds to save before and after the fall
@@ -16,44 +18,67 @@ SAVE_DIR = Path('storage/fall_clips')
 
 
 class EventLogger:
-    def __init__(self, fps=FPS):
+    def __init__(self, fps=FPS, on_saved=None):
+        """
+        on_saved: optional callback, called with the filepath once a clip has
+                  been written. It runs on the writer thread.
+        """
         self.fps = fps
+        self.on_saved = on_saved
         self.frames_before = SECONDS_BEFORE * fps
         self.frames_after  = SECONDS_AFTER  * fps
 
-        # Rolling buffer — automatically drops old frames when full
-        # This always holds the last FRAMES_BEFORE frames
-        self.frame_buffer = deque(maxlen=self.frames_before)
+        # Rolling buffer — a preallocated ring of frames, overwritten in place.
+        # This always holds the last FRAMES_BEFORE frames. Allocated on the
+        # first add_frame() call, once the frame size is known.
+        self._ring        = None
+        self._ring_idx    = 0          # slot the next frame is written to (= oldest once full)
+        self._ring_filled = 0          # number of valid frames in the ring
 
         self._recording      = False   # True when a fall was detected and we're capturing post-fall frames
-        self._post_fall_frames = []    # frames captured after the fall
+        self._post_fall      = None    # preallocated frames captured after the fall
+        self._post_count     = 0       # how many of those are valid
         self._frames_remaining = 0     # how many post-fall frames still to capture
 
         SAVE_DIR.mkdir(parents=True, exist_ok=True)
 
+        # Encoding runs on a daemon writer thread so the capture loop never
+        # stalls on VideoWriter right after a fall. Each job is
+        # (filepath, frame segments); None shuts the thread down.
+        self._write_queue  = queue.Queue()
+        self._closed       = False
+        self._close_lock   = threading.Lock()   # no job can be queued after the None
+        self._writer_thread = threading.Thread(target=self._writer_loop, daemon=True)
+        self._writer_thread.start()
+
     def add_frame(self, frame):
         """
         Call this every frame with the raw webcam frame.
         Handles both buffering pre-fall frames and capturing post-fall frames.
-        Returns the filepath if a clip was just saved, otherwise None.
+        Once enough post-fall frames are in, the clip is queued for the writer
+        thread; on_saved reports its filepath when it has been written.
         """
+        if self._ring is None or self._ring.shape[1:] != frame.shape:
+            self._allocate(frame)
+
         if not self._recording:
             # Normal operation — just keep rolling buffer of recent frames
-            self.frame_buffer.append(frame.copy())
-            return None
+            np.copyto(self._ring[self._ring_idx], frame)
+            self._ring_idx = (self._ring_idx + 1) % len(self._ring)
+            if self._ring_filled < len(self._ring):
+                self._ring_filled += 1
         else:
             # Fall was detected — capture post-fall frames
-            self._post_fall_frames.append(frame.copy())
+            if self._post_count < len(self._post_fall):
+                np.copyto(self._post_fall[self._post_count], frame)
+                self._post_count += 1
             self._frames_remaining -= 1
 
             if self._frames_remaining <= 0:
                 # We have enough post-fall frames — save the clip
-                filepath = self._save_clip()
-                self._recording = False
-                self._post_fall_frames = []
-                return filepath
-
-            return None
+                self._save_clip()
+                self._recording  = False
+                self._post_count = 0
 
     def on_fall_detected(self):
         """
@@ -65,43 +90,111 @@ class EventLogger:
 
         self._recording        = True
         self._frames_remaining = self.frames_after
-        self._post_fall_frames = []
+        self._post_count       = 0
         print(f"Fall detected — capturing {SECONDS_AFTER}s post-fall footage...")
 
     def _save_clip(self):
         """
-        Combines pre-fall buffer + post-fall frames and writes to an mp4 file.
-        Returns the filepath of the saved clip.
+        Combines pre-fall buffer + post-fall frames and queues them for the
+        writer thread. Returns the filepath the clip is being written to, or
+        None if nothing was queued.
         """
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         filepath  = SAVE_DIR / f'fall_{timestamp}.mp4'
 
-        # Combine pre-fall buffer with post-fall frames
-        all_frames = list(self.frame_buffer) + self._post_fall_frames
+        # Pre-fall ring unrolled oldest-first, then post-fall frames —
+        # all views into the preallocated buffers, nothing is copied
+        segments = self._ordered_segments()
+        n_frames = sum(len(seg) for seg in segments)
 
-        if not all_frames:
+        if not n_frames:
             print("WARNING: No frames to save")
             return None
 
-        # Get frame dimensions from first frame
-        h, w = all_frames[0].shape[:2]
+        # Hand the buffers themselves to the writer thread — fresh ones are
+        # allocated on the next add_frame(), so nothing overwrites them mid-encode
+        with self._close_lock:
+            if self._closed:
+                print(f"WARNING: EventLogger is closed — not saving {filepath}")
+                return None
+            self._ring      = None
+            self._post_fall = None
+            self._write_queue.put((filepath, segments))
+        return filepath
+
+    def _writer_loop(self):
+        """Writer thread — owns every cv2.VideoWriter."""
+        while True:
+            job = self._write_queue.get()
+            if job is None:
+                return
+            filepath, segments = job
+            try:
+                self._write_clip(filepath, segments)
+            except Exception as exc:
+                print(f"WARNING: Failed to save clip {filepath}: {exc}")
+                continue
+            if self.on_saved is not None:
+                self.on_saved(filepath)
+
+    def _write_clip(self, filepath, segments):
+        n_frames = sum(len(seg) for seg in segments)
+
+        # Get frame dimensions from the first non-empty segment
+        h, w = next(seg for seg in segments if len(seg)).shape[1:3]
 
         # mp4v codec — works on Windows and Mac
         fourcc = cv2.VideoWriter_fourcc(*'mp4v')
         writer = cv2.VideoWriter(str(filepath), fourcc, self.fps, (w, h))
+        if not writer.isOpened():
+            raise OSError("could not open VideoWriter")
 
-        for frame in all_frames:
-            writer.write(frame)
+        for seg in segments:
+            for frame in seg:
+                writer.write(frame)
 
         writer.release()
 
-        duration = len(all_frames) / self.fps
-        print(f"Clip saved: {filepath} ({duration:.1f}s, {len(all_frames)} frames)")
-        return filepath
+        duration = n_frames / self.fps
+        print(f"Clip saved: {filepath} ({duration:.1f}s, {n_frames} frames)")
+
+    def _allocate(self, frame):
+        """(Re)allocate the frame buffers to match the incoming frame size."""
+        self._ring        = np.empty((max(self.frames_before, 1),) + frame.shape, dtype=frame.dtype)
+        self._ring_idx    = 0
+        self._ring_filled = 0
+        # At least one slot: the frame that arrives right after on_fall_detected()
+        # is always captured, even when SECONDS_AFTER is 0
+        self._post_fall   = np.empty((max(self.frames_after, 1),) + frame.shape, dtype=frame.dtype)
+        self._post_count  = 0
+
+    def _ordered_segments(self):
+        """Buffered frames in chronological order, as a tuple of array views."""
+        if self._ring is None:
+            return ()
+        if self._ring_filled < len(self._ring):
+            pre = (self._ring[:self._ring_filled],)
+        else:
+            pre = (self._ring[self._ring_idx:], self._ring[:self._ring_idx])
+        return pre + (self._post_fall[:self._post_count],)
 
     def reset(self):
         """Call if you want to clear the buffer (e.g. between sessions)."""
-        self.frame_buffer.clear()
+        self._ring_idx         = 0
+        self._ring_filled      = 0
         self._recording        = False
-        self._post_fall_frames = []
-        self._frames_remaining = 0
\ No newline at end of file
+        self._post_count       = 0
+        self._frames_remaining = 0
+
+    def close(self, timeout=None):
+        """
+        Stop accepting clips, let the writer thread finish the queued ones and
+        exit. Waits up to `timeout` seconds (None = until done) for that;
+        returns True if the writer has finished.
+        """
+        with self._close_lock:
+            if not self._closed:
+                self._closed = True
+                self._write_queue.put(None)
+        self._writer_thread.join(timeout)
+        return not self._writer_thread.is_alive()
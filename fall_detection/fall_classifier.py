@@ -1,52 +1,195 @@
 # detection/fall_classifier.py
-import pickle
+import joblib
 import numpy as np
 from pathlib import Path
 
+try:
+    import onnxruntime as ort
+except ImportError:  # optional — fall back to the sklearn model
+    ort = None
+
 MODEL_PATH = Path('fall_detection/models/classifier.pkl')
+ONNX_PATH  = MODEL_PATH.with_suffix('.onnx')  # written by training/export_onnx.py
+
+
+class _FallModel:
+    """
+    The trained model + decision threshold, shared by every classifier that
+    scores windows with it. fall_proba() takes a [N, 250] batch.
+    """
+
+    def __init__(self):
+        # joblib reads both its compressed dumps and plain pickles
+        saved = joblib.load(MODEL_PATH)
+        # New pickles hold the bare classifier; older ones a scaler + clf Pipeline
+        self.clf = saved['clf'] if 'clf' in saved else saved['pipeline']
+        self.threshold = saved.get('threshold', 0.5)
+
+        # sklearn fallback: average the trees directly (after the legacy
+        # scaler, if any) — skips Pipeline dispatch, per-call input validation
+        # and the forest's joblib fan-out (n_jobs=-1), ~5x faster per window
+        steps = getattr(self.clf, 'named_steps', {'clf': self.clf})
+        self._scaler = steps.get('scaler')
+        self._trees  = getattr(steps.get('clf'), 'estimators_', None)
+
+        # Same model exported to ONNX — one native call per frame instead of
+        # sklearn's per-call validation + joblib dispatch
+        self._sess = None
+        if ort is not None and ONNX_PATH.exists():
+            # A single row through 200 trees takes ~10 µs — run it sequentially
+            # on the calling thread rather than waking a thread pool each time
+            opts = ort.SessionOptions()
+            opts.intra_op_num_threads = 1
+            opts.inter_op_num_threads = 1
+            opts.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+            self._sess = ort.InferenceSession(str(ONNX_PATH), opts, providers=['CPUExecutionProvider'])
+            self._in_name = self._sess.get_inputs()[0].name
+            # outputs: [label, probabilities] — only fetch the probabilities
+            self._out_names = [self._sess.get_outputs()[1].name]
+
+    def fall_proba(self, x):
+        """x: float32 [N, 250] -> np.ndarray [N] of P(fall)."""
+        if self._sess is not None:
+            return self._sess.run(self._out_names, {self._in_name: x})[0][:, 1]
+        if self._trees is None:
+            return self.clf.predict_proba(x)[:, 1]
+
+        if self._scaler is not None:
+            # Same arithmetic as StandardScaler.transform on float32 input
+            z = np.array(x, dtype=np.float32, order='C')
+            z -= self._scaler.mean_
+            z /= self._scaler.scale_
+        else:
+            z = np.ascontiguousarray(x, dtype=np.float32)
+        proba = np.zeros(len(z))
+        for tree in self._trees:
+            proba += tree.predict_proba(z, check_input=False)[:, 1]
+        return proba / len(self._trees)
+
 
 class FallClassifier:
-    def __init__(self, confirmation_windows=2):
+    def __init__(self, confirmation_windows=2, model=None):
         """
         confirmation_windows: how many consecutive windows must predict 'fall'
         before we declare an actual fall event.
+        model: a _FallModel to share with other classifiers; loaded from
+               MODEL_PATH if None.
         """
-        with open(MODEL_PATH, 'rb') as f:
-            saved = pickle.load(f)
-        self.pipeline = saved['pipeline']
-        self.threshold = saved.get('threshold', 0.5)
+        self._model = model if model is not None else _FallModel()
+        self._fall_proba = self._model.fall_proba
+        self.clf = self._model.clf
+        self.threshold = self._model.threshold   # also binds self._thr
         self.confirmation_windows = confirmation_windows
         self._consecutive_positives = 0
         self._fall_declared = False
 
     def predict(self, flat_features):
         """
-        flat_features: a flat list of numbers from FeatureEngineer.compute()
+        flat_features: a flat np.ndarray from FeatureEngineer.compute()
                        e.g. 250 numbers (50 frames x 5 features)
                        OR None if the window isn't full yet
         returns: 'fall' | 'no_fall' | 'confirming'
         """
         if flat_features is None:
+            # No window to score counts as a negative window
             self._consecutive_positives = 0
+            self._fall_declared = False
             return 'no_fall'
 
-        # flat_features is a plain list of numbers, pass it directly
-        x = np.array([flat_features])
-        proba = self.pipeline.predict_proba(x)[0, 1]
+        # flat_features is already a 1-D ndarray — add the batch axis as a view
+        x = np.asarray(flat_features, dtype=np.float32).reshape(1, -1)
+        return self.update(float(self._fall_proba(x)[0]))
 
-        if proba >= self.threshold:
-            self._consecutive_positives += 1
-        else:
+    def update(self, proba):
+        """
+        Advance the confirmation state machine with an already-computed
+        fall probability for one window.
+        returns: 'fall' | 'no_fall' | 'confirming'
+        """
+        if proba < self._thr:
             self._consecutive_positives = 0
             self._fall_declared = False
+            return 'no_fall'
 
-        if self._consecutive_positives >= self.confirmation_windows and not self._fall_declared:
+        n = self._consecutive_positives = self._consecutive_positives + 1
+        if n >= self.confirmation_windows and not self._fall_declared:
             self._fall_declared = True
             return 'fall'
-        elif self._consecutive_positives > 0:
-            return 'confirming'
-        return 'no_fall'
+        return 'confirming'
+
+    @property
+    def threshold(self):
+        return self._thr
+
+    @threshold.setter
+    def threshold(self, value):
+        # Stored as a plain float so the per-window comparison stays cheap
+        self._thr = float(value)
+
+    @property
+    def is_confirming(self) -> bool:
+        """True while positive windows are accumulating towards a fall."""
+        return self._consecutive_positives > 0
 
     def reset(self):
         self._consecutive_positives = 0
-        self._fall_declared = False
\ No newline at end of file
+        self._fall_declared = False
+
+
+class BatchedFallClassifier:
+    """
+    Scores windows from several camera streams with one model call per tick.
+
+    Each stream keeps its own confirmation state (a FallClassifier sharing
+    the same loaded model); the per-call model overhead is paid once for
+    the whole batch instead of once per stream.
+
+    Usage
+    -----
+        batched = BatchedFallClassifier(confirmation_windows=3)
+        for stream_id, engineer, landmarks in streams:
+            batched.submit(stream_id, engineer.compute(landmarks))
+        statuses = batched.flush()   # {stream_id: 'fall' | 'confirming' | 'no_fall'}
+    """
+
+    def __init__(self, confirmation_windows=2):
+        self.confirmation_windows = confirmation_windows
+        self._model = _FallModel()
+        self._streams = {}   # stream_id -> FallClassifier
+        self._pending = {}   # stream_id -> flat features (or None) for this tick
+
+    def submit(self, stream_id, flat_features):
+        """Queue one stream's window (or None) for the next flush()."""
+        self._pending[stream_id] = flat_features
+
+    def flush(self):
+        """Score every submitted window in one batch. Returns {stream_id: status}."""
+        pending, self._pending = self._pending, {}
+        statuses = {}
+
+        ready = []
+        for stream_id, flat in pending.items():
+            if flat is None:
+                statuses[stream_id] = self._stream(stream_id).predict(None)
+            else:
+                ready.append((stream_id, flat))
+
+        if ready:
+            x = np.ascontiguousarray(np.vstack([flat for _, flat in ready]), dtype=np.float32)
+            for (stream_id, _), proba in zip(ready, self._model.fall_proba(x).tolist()):
+                statuses[stream_id] = self._stream(stream_id).update(proba)
+
+        return statuses
+
+    def reset(self, stream_id=None):
+        """Reset one stream's confirmation state, or every stream's if None."""
+        if stream_id is None:
+            for clf in self._streams.values():
+                clf.reset()
+        elif stream_id in self._streams:
+            self._streams[stream_id].reset()
+
+    def _stream(self, stream_id):
+        if stream_id not in self._streams:
+            self._streams[stream_id] = FallClassifier(self.confirmation_windows, model=self._model)
+        return self._streams[stream_id]
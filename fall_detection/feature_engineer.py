@@ -1,79 +1,201 @@
 # detection/feature_engineer.py
 
+import math
 import numpy as np
-from collections import deque
+
+try:
+    from numba import njit
+except ImportError:  # optional — the pure-Python path below is used instead
+    njit = None
 
 FEATURE_COLS_SINGLE = ['hip_y', 'hip_velocity', 'spine_angle', 'bbox_aspect_ratio', 'kp_variance']
 WINDOW_SIZE = 50  # number of frames per window — at 15fps this is ~1.3 seconds
+VAR_WINDOW  = 10  # frames in the internal rolling window behind kp_variance
 
 # Generate the flattened feature names for the window
 # e.g. hip_y_0, hip_y_1, ... hip_y_19, hip_velocity_0, ...
 FEATURE_COLS = [f"{feat}_f{i}" for feat in FEATURE_COLS_SINGLE for i in range(WINDOW_SIZE)]
 
+# Left/right hip, left/right shoulder — gathered in one fancy-index per frame
+_PAIR_IDX = np.array([23, 24, 11, 12], dtype=np.intp)
+
 
 class FeatureEngineer:
     def __init__(self, window_size=WINDOW_SIZE):
         self.window_size = window_size
         self.prev_hip_y = None
-        self.y_history = deque(maxlen=10)  # for kp_variance (internal rolling window)
 
-        # This is the sliding window — stores the last N frames of features
-        self.window = deque(maxlen=window_size)
-
-    def compute(self, landmarks):
+        # Rolling window of mean landmark y for kp_variance, kept as running
+        # sums so the variance is O(1) per frame instead of np.var over a deque
+        self._y_hist  = [0.0] * VAR_WINDOW
+        self._y_idx   = 0     # slot the next value goes into
+        self._y_n     = 0     # values in the window, capped at VAR_WINDOW
+        self._y_sum   = 0.0
+        self._y_sqsum = 0.0
+
+        # This is the sliding window — a ring buffer holding the last N frames
+        # of features, one row per feature so the flattened output is a
+        # straight copy: [hip_y_f0 .. hip_y_fN, hip_velocity_f0 .. ]
+        self._buf   = np.zeros((len(FEATURE_COLS_SINGLE), window_size), dtype=np.float32)
+        self._write = 0   # column the next frame is written to (= oldest frame once full)
+        self._count = 0   # frames written so far, capped at window_size
+        self._out   = np.empty_like(self._buf)   # unrolled window handed to the caller
+
+    def compute(self, landmarks, flatten=True):
         """
         Call this every frame. Internally builds up the sliding window.
-        Returns a flat feature vector (length window_size * 5) once the window is full.
+        Returns a flat, C-contiguous float32 np.ndarray (length window_size * 5)
+        once the window is full — FallClassifier reshapes it without copying.
+        The array is reused: it is only valid until the next compute() call,
+        so copy it if you need to keep it.
         Returns None if the window isn't full yet or landmarks is None.
+        flatten=False advances the window but skips building the vector (returns None);
+        window() builds it later, e.g. only on frames that get classified.
         """
         if landmarks is None:
             # Gap in detection — add zeros as a placeholder so window still slides
-            self.window.append([0.0] * len(FEATURE_COLS_SINGLE))
+            self._push(0.0, 0.0, 0.0, 0.0, 0.0)
             self.prev_hip_y = None
             return None
 
         # ---- Compute single-frame features (same as before) ----
-        hip_y = (landmarks[23, 1] + landmarks[24, 1]) / 2.0
-        hip_x = (landmarks[23, 0] + landmarks[24, 0]) / 2.0
+        hip_y, spine_angle, bbox_aspect_ratio, mean_y = _frame_geometry(landmarks)
 
-        hip_velocity = 0.0
-        if self.prev_hip_y is not None:
-            hip_velocity = hip_y - self.prev_hip_y
+        prev_hip_y = self.prev_hip_y
+        hip_velocity = 0.0 if prev_hip_y is None else hip_y - prev_hip_y
         self.prev_hip_y = hip_y
 
-        shoulder_y = (landmarks[11, 1] + landmarks[12, 1]) / 2.0
-        shoulder_x = (landmarks[11, 0] + landmarks[12, 0]) / 2.0
-        dy = hip_y - shoulder_y
-        dx = hip_x - shoulder_x
-        spine_angle = np.degrees(np.arctan2(abs(dx), abs(dy) + 1e-6))
-
-        all_x = landmarks[:, 0]
-        all_y = landmarks[:, 1]
-        bbox_w = all_x.max() - all_x.min()
-        bbox_h = all_y.max() - all_y.min()
-        bbox_aspect_ratio = bbox_h / (bbox_w + 1e-6)
-
-        self.y_history.append(all_y.mean())
-        kp_variance = float(np.var(self.y_history))
-
-        frame_features = [hip_y, hip_velocity, spine_angle, bbox_aspect_ratio, kp_variance]
+        kp_variance = self._push_y(mean_y)
 
         # ---- Add this frame to the sliding window ----
-        self.window.append(frame_features)
+        self._push(hip_y, hip_velocity, spine_angle, bbox_aspect_ratio, kp_variance)
 
         # ---- Only return a prediction-ready vector when window is full ----
-        if len(self.window) < self.window_size:
-            return None  # still warming up
+        if not flatten:
+            return None  # caller doesn't need the vector this frame
+        return self.window()
 
-        # Flatten: [hip_y_f0, hip_y_f1, ..., kp_variance_f19]
-        flat = [self.window[i][j]
-                for j in range(len(FEATURE_COLS_SINGLE))
-                for i in range(self.window_size)]
+    @property
+    def is_full(self):
+        """True once window_size frames have been pushed."""
+        return self._count >= self.window_size
 
-        return flat  # length = window_size * 5 = 100
+    def window(self):
+        """
+        The current window as the flat vector compute() returns — same
+        reuse rules — or None while still warming up.
+        """
+        if self._count < self.window_size:
+            return None
+
+        # Flatten: [hip_y_f0, hip_y_f1, ..., kp_variance_f49]
+        buf, w = self._buf, self._write
+        if w == 0:
+            # Ring is aligned (oldest frame in column 0) — the buffer is the window
+            return buf.ravel()
+        # Unroll the ring oldest-first into the reused output buffer — no allocation
+        np.concatenate((buf[:, w:], buf[:, :w]), axis=1, out=self._out)
+        return self._out.ravel()  # np.ndarray view, length = window_size * 5 = 250
 
     def reset(self):
         """Call between videos during training."""
         self.prev_hip_y = None
-        self.y_history.clear()
-        self.window.clear()
\ No newline at end of file
+        self._y_hist  = [0.0] * VAR_WINDOW
+        self._y_idx   = 0
+        self._y_n     = 0
+        self._y_sum   = 0.0
+        self._y_sqsum = 0.0
+        self._buf.fill(0.0)
+        self._write = 0
+        self._count = 0
+
+    def _push_y(self, y):
+        """Add y to the kp_variance window and return the window's variance."""
+        idx = self._y_idx
+        old = self._y_hist[idx]          # 0.0 until the window has filled
+        self._y_hist[idx] = y
+        self._y_sum   += y - old
+        self._y_sqsum += y * y - old * old
+        if self._y_n < VAR_WINDOW:
+            self._y_n += 1
+
+        idx += 1
+        if idx == VAR_WINDOW:
+            idx = 0
+            # Re-sum once per lap so add/subtract rounding can't accumulate
+            self._y_sum   = math.fsum(self._y_hist)
+            self._y_sqsum = math.fsum(v * v for v in self._y_hist)
+        self._y_idx = idx
+
+        n = self._y_n
+        mean = self._y_sum / n
+        var = self._y_sqsum / n - mean * mean
+        return var if var > 0.0 else 0.0
+
+    def _push(self, hip_y, hip_velocity, spine_angle, bbox_aspect_ratio, kp_variance):
+        """Write one frame's features into the ring buffer."""
+        w, n = self._write, self.window_size
+        self._buf[:, w] = (hip_y, hip_velocity, spine_angle, bbox_aspect_ratio, kp_variance)
+        w += 1
+        self._write = 0 if w == n else w
+        if self._count < n:
+            self._count += 1
+
+
+# ── Single-frame geometry ─────────────────────────────────────────────────────
+# landmarks [33, 4] -> (hip_y, spine_angle, bbox_aspect_ratio, mean_y)
+
+def _frame_geometry_py(landmarks):
+    # One gather + tolist() so the scalar math below runs on Python floats
+    # instead of paying a NumPy scalar dispatch per operation.
+    (lhip_x, lhip_y), (rhip_x, rhip_y), (lsho_x, lsho_y), (rsho_x, rsho_y) = \
+        landmarks[_PAIR_IDX, :2].tolist()
+
+    hip_y = (lhip_y + rhip_y) / 2.0
+    hip_x = (lhip_x + rhip_x) / 2.0
+
+    shoulder_y = (lsho_y + rsho_y) / 2.0
+    shoulder_x = (lsho_x + rsho_x) / 2.0
+    dy = hip_y - shoulder_y
+    dx = hip_x - shoulder_x
+    spine_angle = math.degrees(math.atan2(abs(dx), abs(dy) + 1e-6))
+
+    # Width and height of the landmark bounding box in a single reduction
+    bbox_w, bbox_h = np.ptp(landmarks[:, :2], axis=0).tolist()
+    bbox_aspect_ratio = bbox_h / (bbox_w + 1e-6)
+
+    mean_y = float(landmarks[:, 1].sum()) / len(landmarks)
+    return hip_y, spine_angle, bbox_aspect_ratio, mean_y
+
+
+if njit is not None:
+    @njit(cache=True)
+    def _frame_geometry_nb(landmarks):
+        hip_y = (float(landmarks[23, 1]) + float(landmarks[24, 1])) / 2.0
+        hip_x = (float(landmarks[23, 0]) + float(landmarks[24, 0])) / 2.0
+
+        shoulder_y = (float(landmarks[11, 1]) + float(landmarks[12, 1])) / 2.0
+        shoulder_x = (float(landmarks[11, 0]) + float(landmarks[12, 0])) / 2.0
+        dy = hip_y - shoulder_y
+        dx = hip_x - shoulder_x
+        spine_angle = math.degrees(math.atan2(abs(dx), abs(dy) + 1e-6))
+
+        # Bounding box and mean y in one pass over the landmarks
+        min_x = max_x = landmarks[0, 0]
+        min_y = max_y = landmarks[0, 1]
+        sum_y = 0.0
+        for i in range(landmarks.shape[0]):
+            x = landmarks[i, 0]
+            y = landmarks[i, 1]
+            if x < min_x: min_x = x
+            if x > max_x: max_x = x
+            if y < min_y: min_y = y
+            if y > max_y: max_y = y
+            sum_y += y
+        bbox_aspect_ratio = float(max_y - min_y) / (float(max_x - min_x) + 1e-6)
+
+        return hip_y, spine_angle, bbox_aspect_ratio, sum_y / landmarks.shape[0]
+
+    _frame_geometry = _frame_geometry_nb
+else:
+    _frame_geometry = _frame_geometry_py
\ No newline at end of file
@@ -1,10 +1,15 @@
 # fall_detection/near_fall_detector.py
 
+import math
 import numpy as np
-from collections import deque
 from enum import Enum, auto
 from typing import List, Optional
 
+try:
+    from numba import njit
+except ImportError:  # optional — the pure-Python path below is used instead
+    njit = None
+
 
 # ── Thresholds ────────────────────────────────────────────────────────────────
 # All position metrics are now NORMALISED BY BODY HEIGHT so they are invariant
@@ -31,6 +36,9 @@ RECOVERY_TOLERANCE  = 0.05    # normalised: hip must return within this of basel
 
 BASELINE_FRAMES     = 45      # calm frames to establish standing baseline
 
+UPRIGHT_MAX_NORM    = 1.2     # hip_norm above this is never treated as standing still
+                               # (see is_settled) — stumbling/fallen read higher
+
 # Sanity filter — reject frames where pose is clearly broken
 MAX_ACTIVITY_RATIO  = 5.0     # ratio above this = knee landmark lost/invalid
 
@@ -41,6 +49,10 @@ class _State(Enum):
     RECOVERY  = auto()
 
 
+# Module-level aliases — saves an enum attribute lookup per comparison in update()
+_IDLE, _TRIGGERED, _RECOVERY = _State.IDLE, _State.TRIGGERED, _State.RECOVERY
+
+
 class NearFallDetector:
     """
     Frame-by-frame near-fall detector using body-height-normalised hip position.
@@ -57,16 +69,28 @@ class NearFallDetector:
     def __init__(self, debug: bool = False):
         self.debug = debug
 
-        self._baseline_buf   = deque(maxlen=BASELINE_FRAMES)
+        # Last BASELINE_FRAMES calm hip positions as a ring with a running sum,
+        # so the baseline mean is O(1) per calm frame
+        self._baseline_ring  = [0.0] * BASELINE_FRAMES
+        self._baseline_idx   = 0
+        self._baseline_count = 0
+        self._baseline_sum   = 0.0
         self._standing_norm  = None    # normalised hip position when standing
+        # Baseline as of the last settled frame. Unlike _standing_norm (which
+        # follows any calm frame, lying still included) it only moves while
+        # the person stays upright at it — see is_settled.
+        self._upright_norm   = None
 
-        self._prev_norm    = None
-        self._velocity_buf = deque(maxlen=3)
+        self._prev_norm = None
+        # Last three velocities, newest first. Zero-filled is equivalent to an
+        # empty window: the first velocity after a reset is always 0.0.
+        self._vel_a = self._vel_b = self._vel_c = 0.0
 
         self._state                  = _State.IDLE
         self._recovery_frames_left   = 0
         self._lowest_norm_in_recovery = None
         self._triggered_rules        = []
+        self._settled                = False   # see is_settled
 
     # ── Public API ────────────────────────────────────────────────────────────
 
@@ -75,28 +99,17 @@ class NearFallDetector:
         landmarks : np.ndarray [33, 4] normalised [0,1] or None.
         Returns 'near_fall' | 'sitting' | 'no_event'
         """
+        self._settled = False
+
         if landmarks is None:
             self._prev_norm       = None
             self._triggered_rules = []
             return 'no_event'
 
-        self._triggered_rules = []
-
-        # ── Keypoints ─────────────────────────────────────────────────────────
-        hip_y      = _avg_y(landmarks, 23, 24)
-        knee_y     = _avg_y(landmarks, 25, 26)
-        shoulder_y = _avg_y(landmarks, 11, 12)
-        # ── Body height (shoulder to knee — knees always in frame) ───────────
-        body_height = abs(knee_y - shoulder_y) + 1e-6
-
-        # ── Normalised hip position (0 = at shoulder, ~1 = at knee height) ───
-        # Increases as hip drops — standing ≈ 1.0, stumbling > 1.2, fallen > 1.5
-        hip_norm = (hip_y - shoulder_y) / body_height
+        rules = self._triggered_rules = []
 
-        # ── Activity ratio ────────────────────────────────────────────────────
-        leg_height   = abs(knee_y - hip_y) + 1e-6
-        torso_height = abs(hip_y - shoulder_y) + 1e-6
-        activity_ratio = leg_height / torso_height
+        # ── Body-height-normalised hip position + activity ratio ──────────────
+        hip_norm, activity_ratio = _body_geometry(landmarks)
 
         # ── Sanity check — reject broken pose frames ──────────────────────────
         if activity_ratio > MAX_ACTIVITY_RATIO or not (-0.2 <= hip_norm <= 2.5):
@@ -105,93 +118,140 @@ class NearFallDetector:
             self._prev_norm = None
             return 'no_event'
 
+        # Per-frame state is read into locals once and written back below —
+        # this runs every frame, so avoid repeated self.* lookups.
+        state         = self._state
+        standing_norm = self._standing_norm
+
         # ── Velocity on normalised position ───────────────────────────────────
-        velocity = 0.0
-        if self._prev_norm is not None:
-            velocity = hip_norm - self._prev_norm
+        prev_norm = self._prev_norm
+        velocity = 0.0 if prev_norm is None else hip_norm - prev_norm
         self._prev_norm = hip_norm
-        self._velocity_buf.append(velocity)
-        peak_velocity = max(self._velocity_buf)
+
+        vel_b = self._vel_a
+        vel_c = self._vel_b
+        self._vel_a, self._vel_b, self._vel_c = velocity, vel_b, vel_c
+        peak_velocity = velocity if velocity > vel_b else vel_b
+        if vel_c > peak_velocity:
+            peak_velocity = vel_c
+        calm = abs(peak_velocity) < VELOCITY_CALM
 
         # ── Baseline — update whenever calm, any state ────────────────────────
-        if abs(peak_velocity) < VELOCITY_CALM:
-            self._baseline_buf.append(hip_norm)
-            if len(self._baseline_buf) >= BASELINE_FRAMES:
-                self._standing_norm = float(np.mean(self._baseline_buf))
+        if calm:
+            standing_norm = self._push_baseline(hip_norm)
+
+        # ── Settled — idle, calm and upright at the standing baseline ────────
+        # An IDLE frame this calm cannot trigger (VELOCITY_CALM < VELOCITY_TRIGGER).
+        # Compared against _upright_norm, not standing_norm: after a fall the
+        # baseline re-forms wherever the person lies still, and that must not
+        # count as standing.
+        if state is _IDLE and calm and standing_norm is not None and hip_norm <= UPRIGHT_MAX_NORM:
+            upright = self._upright_norm
+            if upright is None:
+                upright = standing_norm
+            settled = (
+                abs(hip_norm - upright) <= RECOVERY_TOLERANCE
+                and abs(standing_norm - upright) <= RECOVERY_TOLERANCE
+            )
+            if settled:
+                self._upright_norm = standing_norm
+            self._settled = settled
 
         # ── Debug ─────────────────────────────────────────────────────────────
         if self.debug:
-            b   = f"{self._standing_norm:.3f}" if self._standing_norm is not None else "building"
+            b   = f"{standing_norm:.3f}" if standing_norm is not None else "building"
             low = f"{self._lowest_norm_in_recovery:.3f}" if self._lowest_norm_in_recovery else "-"
             print(
-                f"[NF] state={self._state.name:<10} "
+                f"[NF] state={state.name:<10} "
                 f"hip_norm={hip_norm:.3f}  vel={peak_velocity:+.4f}  "
                 f"ratio={activity_ratio:.2f}  baseline={b}  "
                 f"lowest={low}  recover_left={self._recovery_frames_left}"
             )
 
         # ── State machine ─────────────────────────────────────────────────────
-        if self._state is _State.IDLE:
+        if state is _IDLE:
             # CHANGE 1: Must exceed the higher velocity threshold
             velocity_spike = peak_velocity >= VELOCITY_TRIGGER
             
             # CHANGE 2: Must be physically below the standing baseline
             # This ignores jumps/dancing where the hip is higher than normal.
             is_below_baseline = True
-            if self._standing_norm is not None:
-                is_below_baseline = hip_norm > (self._standing_norm + 0.01)
+            if standing_norm is not None:
+                is_below_baseline = hip_norm > (standing_norm + 0.01)
 
             if velocity_spike and is_below_baseline:
-                self._triggered_rules.append('velocity_spike_below_baseline')
-                self._state = _State.TRIGGERED
+                rules.append('velocity_spike_below_baseline')
+                self._state = _TRIGGERED
 
-        elif self._state is _State.TRIGGERED:
+        elif state is _TRIGGERED:
             is_sitting = (
                 activity_ratio < ACTIVITY_RATIO_SIT
                 and abs(peak_velocity) < VELOCITY_TRIGGER
             )
             if is_sitting:
-                self._triggered_rules.append('activity_ratio_sit')
-                self._state = _State.IDLE
+                rules.append('activity_ratio_sit')
+                self._state = _IDLE
                 return 'sitting'
 
-            self._triggered_rules.append('entering_recovery')
-            self._state                   = _State.RECOVERY
+            rules.append('entering_recovery')
+            self._state                   = _RECOVERY
             self._recovery_frames_left    = RECOVERY_FRAMES
             self._lowest_norm_in_recovery = hip_norm
 
-        elif self._state is _State.RECOVERY:
-            self._recovery_frames_left -= 1
+        else:  # _RECOVERY
+            recovery_left = self._recovery_frames_left - 1
+            self._recovery_frames_left = recovery_left
 
             # Track the deepest point of the drop
-            if hip_norm > self._lowest_norm_in_recovery:
-                self._lowest_norm_in_recovery = hip_norm
+            lowest = self._lowest_norm_in_recovery
+            if hip_norm > lowest:
+                lowest = self._lowest_norm_in_recovery = hip_norm
 
             # Only fire near_fall if:
             # 1. baseline is known
             # 2. hip actually dropped meaningfully (MIN_DROP_TO_QUALIFY)
             # 3. hip has now returned close to standing position
             dropped_enough = (
-                self._standing_norm is not None
-                and self._lowest_norm_in_recovery > self._standing_norm + MIN_DROP_TO_QUALIFY
+                standing_norm is not None
+                and lowest > standing_norm + MIN_DROP_TO_QUALIFY
             )
             recovered = (
                 dropped_enough
-                and hip_norm <= self._standing_norm + RECOVERY_TOLERANCE
+                and hip_norm <= standing_norm + RECOVERY_TOLERANCE
             )
 
             if recovered:
-                self._triggered_rules.append('recovery_detected')
-                self._state = _State.IDLE
+                rules.append('recovery_detected')
+                self._state = _IDLE
                 self._lowest_norm_in_recovery = None
                 return 'near_fall'
 
-            if self._recovery_frames_left <= 0:
-                self._state = _State.IDLE
+            if recovery_left <= 0:
+                self._state = _IDLE
                 self._lowest_norm_in_recovery = None
 
         return 'no_event'
 
+    def _push_baseline(self, hip_norm: float) -> Optional[float]:
+        """Add a calm frame to the baseline window. Returns the standing baseline."""
+        ring, idx = self._baseline_ring, self._baseline_idx
+        self._baseline_sum += hip_norm - ring[idx]   # ring[idx] is 0.0 until full
+        ring[idx] = hip_norm
+
+        idx += 1
+        if idx == BASELINE_FRAMES:
+            idx = 0
+            # Re-sum once per lap so add/subtract rounding can't accumulate
+            self._baseline_sum = math.fsum(ring)
+        self._baseline_idx = idx
+
+        if self._baseline_count < BASELINE_FRAMES:
+            self._baseline_count += 1
+            if self._baseline_count < BASELINE_FRAMES:
+                return self._standing_norm
+        self._standing_norm = self._baseline_sum / BASELINE_FRAMES
+        return self._standing_norm
+
     @property
     def triggered_rules(self) -> List[str]:
         return list(self._triggered_rules)
@@ -204,16 +264,74 @@ class NearFallDetector:
     def standing_baseline(self) -> Optional[float]:
         return self._standing_norm
 
+    @property
+    def is_settled(self) -> bool:
+        """
+        True when the last frame was calm, the state machine is IDLE and the
+        hip is upright (hip_norm <= UPRIGHT_MAX_NORM) at the baseline last
+        seen while standing — i.e. the person is standing still. Lying still
+        after a drop is never settled, however long it lasts.
+        DetectionPipeline uses this to skip the RF classifier.
+        """
+        return self._settled
+
     def reset(self):
-        self._baseline_buf.clear()
+        self._baseline_ring           = [0.0] * BASELINE_FRAMES
+        self._baseline_idx            = 0
+        self._baseline_count          = 0
+        self._baseline_sum            = 0.0
         self._standing_norm           = None
+        self._upright_norm            = None
         self._prev_norm               = None
-        self._velocity_buf.clear()
-        self._state                   = _State.IDLE
+        self._vel_a = self._vel_b = self._vel_c = 0.0
+        self._state                   = _IDLE
         self._recovery_frames_left    = 0
         self._lowest_norm_in_recovery = None
         self._triggered_rules         = []
+        self._settled                 = False
+
 
+# ── Per-frame geometry ────────────────────────────────────────────────────────
+# landmarks [33, 4] -> (hip_norm, activity_ratio)
 
 def _avg_y(landmarks: np.ndarray, idx_a: int, idx_b: int) -> float:
-    return float((landmarks[idx_a, 1] + landmarks[idx_b, 1]) / 2.0)
\ No newline at end of file
+    return float((landmarks[idx_a, 1] + landmarks[idx_b, 1]) / 2.0)
+
+
+def _body_geometry_py(landmarks: np.ndarray):
+    # ── Keypoints ─────────────────────────────────────────────────────────────
+    hip_y      = _avg_y(landmarks, 23, 24)
+    knee_y     = _avg_y(landmarks, 25, 26)
+    shoulder_y = _avg_y(landmarks, 11, 12)
+    # ── Body height (shoulder to knee — knees always in frame) ───────────────
+    body_height = abs(knee_y - shoulder_y) + 1e-6
+
+    # ── Normalised hip position (0 = at shoulder, ~1 = at knee height) ───────
+    # Increases as hip drops — standing ≈ 1.0, stumbling > 1.2, fallen > 1.5
+    hip_norm = (hip_y - shoulder_y) / body_height
+
+    # ── Activity ratio ────────────────────────────────────────────────────────
+    leg_height   = abs(knee_y - hip_y) + 1e-6
+    torso_height = abs(hip_y - shoulder_y) + 1e-6
+    activity_ratio = leg_height / torso_height
+
+    return hip_norm, activity_ratio
+
+
+if njit is not None:
+    @njit(cache=True)
+    def _body_geometry_nb(landmarks):
+        hip_y      = (float(landmarks[23, 1]) + float(landmarks[24, 1])) / 2.0
+        knee_y     = (float(landmarks[25, 1]) + float(landmarks[26, 1])) / 2.0
+        shoulder_y = (float(landmarks[11, 1]) + float(landmarks[12, 1])) / 2.0
+        body_height = abs(knee_y - shoulder_y) + 1e-6
+
+        hip_norm = (hip_y - shoulder_y) / body_height
+
+        leg_height   = abs(knee_y - hip_y) + 1e-6
+        torso_height = abs(hip_y - shoulder_y) + 1e-6
+        return hip_norm, leg_height / torso_height
+
+    _body_geometry = _body_geometry_nb
+else:
+    _body_geometry = _body_geometry_py
@@ -1,12 +1,15 @@
 # fall_detection/pipeline.py
 
 import cv2
+import queue
+import threading
 import mediapipe as mp
 import numpy as np
 from dataclasses import dataclass, field
+from functools import lru_cache
 from typing import Optional, List
 
-from .pose_estimator    import PoseEstimator
+from .pose_estimator    import PoseEstimator, MODEL_COMPLEXITY
 from .feature_engineer  import FeatureEngineer
 from .fall_classifier   import FallClassifier
 from .near_fall_detector import NearFallDetector
@@ -24,7 +27,9 @@ class FrameResult:
     alert           : True when either classifier fires a positive result
     pose_landmarks  : raw MediaPipe landmark array [33, 4], or None
     debug_rules     : list of rule names that fired in the near-fall detector
-    annotated_frame : BGR frame with skeleton + status overlays drawn on it
+    annotated_frame : BGR frame with skeleton + status overlays drawn on it,
+                      or the input frame itself (undrawn) when the pipeline's
+                      render_mode skipped rendering for this frame
     """
     rf_status        : str
     near_fall_status : str
@@ -45,6 +50,9 @@ _COLOUR = {
     'no_pose'    : (180, 180, 180),   # grey
 }
 
+# render_mode values accepted by DetectionPipeline
+RENDER_MODES = ('always', 'on_alert', 'never')
+
 
 class DetectionPipeline:
     """
@@ -52,8 +60,23 @@ class DetectionPipeline:
 
     Every frame is processed by:
       • MediaPipe  — pose estimation
-      • RF path    — FeatureEngineer → FallClassifier   (window-based)
       • Rules path — NearFallDetector                   (frame-by-frame)
+      • RF path    — FeatureEngineer → FallClassifier   (window-based)
+                     skipped while the rules path reports the person is
+                     standing still (skip_rf_when_settled)
+
+    render_mode controls the annotated frame:
+      'always'   — copy the frame and draw skeleton + labels every frame
+      'on_alert' — only when a status is not 'no_fall' / 'no_event'
+      'never'    — never; annotated_frame is the input frame untouched
+    Copying and drawing a 720p frame is a large share of per-frame work, so
+    callers that don't show the pipeline's own overlay should pick 'never'.
+
+    pipelined=True runs MediaPipe on a worker thread, one frame ahead of the
+    rules/RF paths: while frame N+1's pose is estimated, frame N is scored
+    and drawn. Each result then describes the PREVIOUS frame passed in (the
+    very first call returns an empty result), and annotated_frame is that
+    previous frame.
 
     Usage
     -----
@@ -72,16 +95,43 @@ class DetectionPipeline:
         draw_skeleton: bool = True,
         show_debug_rules: bool = False,
         near_fall_debug: bool = False,   # set True to print live metrics for threshold tuning
+        skip_rf_when_settled: bool = True,
+        render_mode: str = 'always',
+        pipelined: bool = False,
+        pose_model_complexity: int = MODEL_COMPLEXITY,   # 0 = Lite: faster, see pose_estimator
+        still_frame_threshold: Optional[float] = None,   # skip MediaPipe on unchanged frames, see pose_estimator
     ):
-        self._pose      = PoseEstimator()
+        if render_mode not in RENDER_MODES:
+            raise ValueError(f"Unknown render_mode: '{render_mode}'")
+
+        self._pose      = PoseEstimator(
+            model_complexity=pose_model_complexity,
+            still_frame_threshold=still_frame_threshold,
+        )
         self._engineer  = FeatureEngineer()
         self._classifier = FallClassifier(confirmation_windows=rf_confirmation_windows)
         self._near_fall  = NearFallDetector(debug=near_fall_debug)
 
-        self._mp_drawing      = mp.solutions.drawing_utils
         self._mp_pose         = mp.solutions.pose
+        # Skeleton edges as an [E, 2] index array so _draw_pose can gather
+        # every edge's endpoints at once
+        self._connections     = np.array(sorted(self._mp_pose.POSE_CONNECTIONS), dtype=np.intp)
         self._draw_skeleton   = draw_skeleton
         self._show_debug      = show_debug_rules
+        self._skip_rf_when_settled = skip_rf_when_settled
+        self._render_mode     = render_mode
+        self._skeleton        = None   # landmarks _draw_pose draws (see _estimate)
+
+        # ── Optional pose-estimation worker (pipelined=True) ──────────────────
+        # The worker owns self._pose from here on; MediaPipe's Pose is not
+        # thread-safe, so process_frame never touches it directly.
+        self._pose_thread = None
+        if pipelined:
+            self._pose_q     = queue.Queue(maxsize=1)
+            self._result_q   = queue.Queue(maxsize=1)
+            self._in_flight  = False
+            self._pose_thread = threading.Thread(target=self._pose_loop, daemon=True)
+            self._pose_thread.start()
 
     # ── Main entry point ──────────────────────────────────────────────────────
 
@@ -90,13 +140,26 @@ class DetectionPipeline:
         Process a single BGR frame.
         Returns a FrameResult with all statuses and the annotated frame.
         """
-        annotated = frame_bgr.copy()
-
         # ── 1. Pose estimation ────────────────────────────────────────────────
-        landmarks, _ = self._pose.process_frame(frame_bgr)
+        if self._pose_thread is None:
+            landmarks, self._skeleton = self._estimate(frame_bgr)
+        else:
+            # Hand this frame to the worker and score the one it just finished
+            self._pose_q.put(frame_bgr)
+            if not self._in_flight:
+                self._in_flight = True
+                self._skeleton = None
+                return FrameResult('no_fall', 'no_event', False, None, [], frame_bgr)
+            item = self._result_q.get()
+            if isinstance(item, BaseException):
+                raise item
+            frame_bgr, landmarks, self._skeleton = item
 
         if landmarks is None:
-            _put_text(annotated, 'No pose detected', (20, 40), _COLOUR['no_pose'])
+            annotated = frame_bgr
+            if self._render_mode == 'always':
+                annotated = frame_bgr.copy()
+                _put_text(annotated, 'No pose detected', (20, 40), _COLOUR['no_pose'])
             return FrameResult(
                 rf_status        = 'no_fall',
                 near_fall_status = 'no_event',
@@ -106,23 +169,37 @@ class DetectionPipeline:
                 annotated_frame  = annotated,
             )
 
-        # ── 2. Draw skeleton ──────────────────────────────────────────────────
-        if self._draw_skeleton:
-            self._draw_pose(frame_bgr, annotated, landmarks)
-
-        # ── 3. RF path ────────────────────────────────────────────────────────
-        flat_features = self._engineer.compute(landmarks)
-        rf_status     = self._classifier.predict(flat_features)
-
-        # ── 4. Rules path ─────────────────────────────────────────────────────
+        # ── 2. Rules path ─────────────────────────────────────────────────────
         near_fall_status = self._near_fall.update(landmarks)
         debug_rules      = self._near_fall.triggered_rules
 
-        # ── 5. Composite alert ────────────────────────────────────────────────
+        # ── 3. RF path ────────────────────────────────────────────────────────
+        # While the person is standing still at their baseline (and no fall is
+        # being confirmed) the window still advances, but the classifier is
+        # skipped and the frame counts as a negative window.
+        if (self._skip_rf_when_settled
+                and self._near_fall.is_settled
+                and not self._classifier.is_confirming):
+            self._engineer.compute(landmarks, flatten=False)
+            rf_status = self._classifier.predict(None)
+        else:
+            flat_features = self._engineer.compute(landmarks)
+            rf_status     = self._classifier.predict(flat_features)
+
+        # ── 4. Composite alert ────────────────────────────────────────────────
         alert = rf_status in ('fall', 'confirming') or near_fall_status == 'near_fall'
 
-        # ── 6. Overlay labels ─────────────────────────────────────────────────
-        self._draw_labels(annotated, rf_status, near_fall_status, debug_rules)
+        # ── 5. Skeleton + labels ──────────────────────────────────────────────
+        # The frame is only copied once we know it will be drawn on
+        mode = self._render_mode
+        if mode == 'always' or (mode == 'on_alert' and (
+                rf_status != 'no_fall' or near_fall_status != 'no_event')):
+            annotated = frame_bgr.copy()
+            if self._draw_skeleton:
+                self._draw_pose(frame_bgr, annotated, landmarks)
+            self._draw_labels(annotated, rf_status, near_fall_status, debug_rules)
+        else:
+            annotated = frame_bgr
 
         return FrameResult(
             rf_status        = rf_status,
@@ -141,23 +218,70 @@ class DetectionPipeline:
 
     def close(self):
         """Release MediaPipe resources."""
+        if self._pose_thread is not None:
+            # Drop a finished-but-unread result so the worker can't block on it
+            try:
+                self._result_q.get_nowait()
+            except queue.Empty:
+                pass
+            self._pose_q.put(None)
+            self._pose_thread.join()
+            self._pose_thread = None
         self._pose.close()
 
     # ── Private helpers ───────────────────────────────────────────────────────
 
+    def _estimate(self, frame_bgr):
+        """
+        Run pose estimation. Returns (landmarks, skeleton): landmarks as from
+        PoseEstimator.process_frame, skeleton the pose to draw — also set
+        when MediaPipe found a pose the estimator then rejected, or None.
+        """
+        landmarks = self._pose.process_frame(frame_bgr)
+        results   = self._pose._last_results
+        if landmarks is not None or not (results and results.pose_landmarks):
+            return landmarks, landmarks
+        return None, self._pose._arr.copy()
+
+    def _pose_loop(self):
+        """Worker thread for pipelined=True — frames in, (frame, landmarks, skeleton) out."""
+        while True:
+            frame = self._pose_q.get()
+            if frame is None:
+                return
+            try:
+                self._result_q.put((frame, *self._estimate(frame)))
+            except Exception as exc:
+                self._result_q.put(exc)
+
     def _draw_pose(self, original_bgr, annotated, landmarks):
-        """Draw skeleton using the cached MediaPipe result — never re-processes the frame."""
-        results = self._pose._last_results
-        if results is not None and results.pose_landmarks:
-            self._mp_drawing.draw_landmarks(
-                annotated,
-                results.pose_landmarks,
-                self._mp_pose.POSE_CONNECTIONS,
-                landmark_drawing_spec=self._mp_drawing.DrawingSpec(
-                    color=(0, 0, 0), thickness=6, circle_radius=2),
-                connection_drawing_spec=self._mp_drawing.DrawingSpec(
-                    color=(0, 0, 0), thickness=6),
-            )
+        """
+        Draw skeleton for the last frame processed — never re-processes the
+        frame. Drawn even when the pose estimator rejected the landmarks,
+        as mp_drawing.draw_landmarks did.
+        """
+        lm = self._skeleton
+        if lm is None:
+            return
+
+        # Same visibility / in-frame rules as mp_drawing.draw_landmarks
+        h, w = annotated.shape[:2]
+        x, y = lm[:, 0], lm[:, 1]
+        shown = (lm[:, 3] >= 0.5) & (x >= 0.0) & (x <= 1.0) & (y >= 0.0) & (y <= 1.0)
+        pts = np.empty((len(lm), 2), dtype=np.int32)
+        pts[:, 0] = np.minimum(x * w, w - 1)
+        pts[:, 1] = np.minimum(y * h, h - 1)
+
+        # One polylines call per layer instead of a cv2.line / cv2.circle per
+        # edge and joint. A zero-length segment draws a dot of diameter
+        # `thickness`, matching the old white-bordered joint circles.
+        edges = self._connections[shown[self._connections].all(axis=1)]
+        if len(edges):
+            cv2.polylines(annotated, pts[edges], False, (0, 0, 0), 6)
+        joints = pts[shown][:, None, :].repeat(2, axis=1)
+        if len(joints):
+            cv2.polylines(annotated, joints, False, (255, 255, 255), 13)
+            cv2.polylines(annotated, joints, False, (0, 0, 0), 10)
 
     def _draw_labels(self, frame, rf_status, near_fall_status, debug_rules):
         h, w = frame.shape[:2]
@@ -187,19 +311,29 @@ class DetectionPipeline:
 
 # ── Drawing utilities ─────────────────────────────────────────────────────────
 
+_LABEL_FONT  = cv2.FONT_HERSHEY_SIMPLEX
+_BANNER_FONT = cv2.FONT_HERSHEY_DUPLEX
+
+
 def _put_text(frame, text, origin, colour, scale=0.7, thickness=2):
     cv2.putText(frame, text, origin,
-                cv2.FONT_HERSHEY_SIMPLEX, scale, (0, 0, 0), thickness + 2)
+                _LABEL_FONT, scale, (0, 0, 0), thickness + 2)
     cv2.putText(frame, text, origin,
-                cv2.FONT_HERSHEY_SIMPLEX, scale, colour, thickness)
+                _LABEL_FONT, scale, colour, thickness)
+
+
+@lru_cache(maxsize=None)
+def _banner_size(text):
+    """Banner text size — only a handful of fixed strings, so measure each once."""
+    return cv2.getTextSize(text, _BANNER_FONT, 1.2, 2)[0]
 
 
 def _banner(frame, text, colour):
     h, w = frame.shape[:2]
-    (tw, th), _ = cv2.getTextSize(text, cv2.FONT_HERSHEY_DUPLEX, 1.2, 2)
+    tw, th = _banner_size(text)
     x = (w - tw) // 2
     y = 120
     cv2.rectangle(frame, (x - 10, y - th - 10), (x + tw + 10, y + 10),
                   (0, 0, 0), -1)
     cv2.putText(frame, text, (x, y),
-                cv2.FONT_HERSHEY_DUPLEX, 1.2, colour, 2)
\ No newline at end of file
+                _BANNER_FONT, 1.2, colour, 2)
\ No newline at end of file
@@ -3,52 +3,163 @@
 import cv2
 import mediapipe as mp
 import numpy as np
+from operator import attrgetter
+
+try:
+    from numba import njit
+except ImportError:  # optional — the pure-Python path below is used instead
+    njit = None
 
 # Landmarks we actually need — if any of these are out of range or low
 # visibility, the frame is unreliable and we return None.
-_KEY_LANDMARKS = [11, 12, 23, 24, 25, 26]   # shoulders, hips, knees
+_KEY_LANDMARKS = np.array([11, 12, 23, 24, 25, 26], dtype=np.intp)   # shoulders, hips, knees
 _MIN_VISIBILITY = 0.4
+_NUM_LANDMARKS  = 33
+
+# Reads all four fields of a landmark in one C call
+_LANDMARK_FIELDS = attrgetter('x', 'y', 'z', 'visibility')
+
+# Frames wider than this are downscaled before pose estimation. MediaPipe's
+# cost scales with input pixels, and landmarks come back normalised to [0,1]
+# so nothing downstream depends on the input resolution.
+TARGET_WIDTH = 480
+
+# MediaPipe Pose model: 0 = Lite, 1 = Full, 2 = Heavy. Lite is roughly 2x
+# faster on CPU, but classifier.pkl was trained on Full-model landmarks —
+# re-extract and retrain before switching the default.
+MODEL_COMPLEXITY = 1
+
+# Still-frame gate (opt-in, see PoseEstimator): frames are compared as small
+# thumbnails, and MediaPipe is re-run at least every _MAX_STILL_FRAMES frames
+# so a slowly drifting scene can't keep reusing a stale pose.
+_THUMB_SIZE       = (64, 48)
+_MAX_STILL_FRAMES = 15
 
 
 class PoseEstimator:
-    def __init__(self):
+    def __init__(self, target_width=TARGET_WIDTH, model_complexity=MODEL_COMPLEXITY,
+                 still_frame_threshold=None):
+        """
+        target_width: frames wider than this are downscaled (aspect preserved)
+                      before being handed to MediaPipe. None disables it.
+        model_complexity: MediaPipe Pose model — 0 (Lite), 1 (Full), 2 (Heavy).
+        still_frame_threshold: if set, a frame whose mean absolute pixel change
+                      (0-255, on a thumbnail) since the last frame MediaPipe
+                      processed is below this skips inference and returns the
+                      previous landmarks again. None (default) runs MediaPipe on
+                      every frame — repeated landmarks remove the frame-to-frame
+                      jitter the classifier was trained with.
+        """
+        self.target_width = target_width
+        self.still_frame_threshold = still_frame_threshold
         self.mp_pose = mp.solutions.pose
         self.pose = self.mp_pose.Pose(
             static_image_mode=False,
-            model_complexity=1,
+            model_complexity=model_complexity,
             min_detection_confidence=0.5,
             min_tracking_confidence=0.5,
         )
-        self._last_results = None
+        self._last_results = None   # raw MediaPipe result, reused for skeleton drawing
+        self._arr = np.empty((_NUM_LANDMARKS, 4), dtype=np.float32)
+        # Reused resize / colour-conversion destinations. OpenCV writes into
+        # dst when its shape matches and reallocates otherwise, so storing the
+        # returned array keeps one buffer per stream resolution.
+        self._small_buf = None
+        self._rgb_buf   = None
+
+        # Still-frame gate state
+        self._thumb          = None   # scratch thumbnail for the current frame
+        self._ref_thumb      = None   # thumbnail of the last frame MediaPipe saw
+        self._still_run      = 0
+        self._last_landmarks = None   # what process_frame returned for that frame
 
     def process_frame(self, frame_bgr):
         """
-        Returns (landmarks_array, frame_bgr) where landmarks_array is
-        np.ndarray [33, 4] (x, y, z, visibility) in normalised [0,1] coords,
-        or None if no pose found or landmarks are unreliable.
+        Returns landmarks_array — np.ndarray [33, 4] float32 (x, y, z, visibility)
+        in normalised [0,1] coords, or None if no pose found or landmarks are
+        unreliable.
         """
-        rgb = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB)
+        if self.still_frame_threshold is None:
+            return self._estimate(frame_bgr)
+
+        if self._is_still(frame_bgr):
+            last = self._last_landmarks
+            return None if last is None else last.copy()
+        self._last_landmarks = self._estimate(frame_bgr)
+        return self._last_landmarks
+
+    def close(self):
+        self.pose.close()
+
+    def _is_still(self, frame_bgr):
+        """True if frame_bgr barely differs from the last frame MediaPipe processed."""
+        thumb = self._thumb = cv2.resize(
+            frame_bgr, _THUMB_SIZE, dst=self._thumb, interpolation=cv2.INTER_AREA)
+        ref = self._ref_thumb
+        if (ref is not None and self._still_run < _MAX_STILL_FRAMES
+                and cv2.norm(thumb, ref, cv2.NORM_L1) < self.still_frame_threshold * thumb.size):
+            self._still_run += 1
+            return True
+
+        # This frame will be processed — it becomes the new reference
+        self._thumb, self._ref_thumb = ref, thumb
+        self._still_run = 0
+        return False
+
+    def _estimate(self, frame_bgr):
+        """Run MediaPipe on frame_bgr and validate the result (see process_frame)."""
+        h, w = frame_bgr.shape[:2]
+        if self.target_width and w > self.target_width:
+            size = (self.target_width, round(h * self.target_width / w))
+            frame_bgr = self._small_buf = cv2.resize(
+                frame_bgr, size, dst=self._small_buf, interpolation=cv2.INTER_AREA)
+        rgb = self._rgb_buf = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB, dst=self._rgb_buf)
         results = self.pose.process(rgb)
         self._last_results = results
 
         if not results.pose_landmarks:
-            return None, frame_bgr
+            return None
 
-        lm  = results.pose_landmarks.landmark
-        arr = np.array([[p.x, p.y, p.z, p.visibility] for p in lm])
+        # Fill the preallocated buffer in place with a single assignment
+        arr = self._arr
+        arr[:] = list(map(_LANDMARK_FIELDS, results.pose_landmarks.landmark))
 
         # ── Validate key landmarks ────────────────────────────────────────────
         # MediaPipe can extrapolate landmarks outside [0,1] when the person
         # moves near the frame edge or very fast. Reject the whole frame if
         # any key landmark is out of range or has low visibility.
-        for idx in _KEY_LANDMARKS:
-            x, y, _, vis = arr[idx]
-            if vis < _MIN_VISIBILITY:
-                return None, frame_bgr
-            if not (0.0 <= x <= 1.0) or not (0.0 <= y <= 1.0):
-                return None, frame_bgr
+        if not _key_landmarks_valid(arr, _KEY_LANDMARKS, _MIN_VISIBILITY):
+            return None
 
-        return arr, frame_bgr
+        # Callers hold on to the array (e.g. FrameResult), so hand out a copy
+        return arr.copy()
 
-    def close(self):
-        self.pose.close()
\ No newline at end of file
+
+# ── Key-landmark validation ───────────────────────────────────────────────────
+# (landmarks [33, 4], key indices, min visibility) -> True if the frame is usable
+
+def _key_landmarks_valid_py(arr, key_idx, min_vis):
+    # One gather + tolist() so the comparisons run on Python floats
+    for x, y, _, vis in arr[key_idx].tolist():
+        if vis < min_vis:
+            return False
+        if not (0.0 <= x <= 1.0) or not (0.0 <= y <= 1.0):
+            return False
+    return True
+
+
+if njit is not None:
+    @njit(cache=True)
+    def _key_landmarks_valid_nb(arr, key_idx, min_vis):
+        for i in key_idx:
+            if arr[i, 3] < min_vis:
+                return False
+            x = arr[i, 0]
+            y = arr[i, 1]
+            if not (0.0 <= x <= 1.0) or not (0.0 <= y <= 1.0):
+                return False
+        return True
+
+    _key_landmarks_valid = _key_landmarks_valid_nb
+else:
+    _key_landmarks_valid = _key_landmarks_valid_py
\ No newline at end of file
@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import logging
 import os
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from datetime import datetime
 
@@ -14,6 +15,27 @@ from twilio.base.exceptions import TwilioRestException
 # Logging
 logger = logging.getLogger(__name__)
 
+# Upper bound on contacts called at the same time
+MAX_PARALLEL_CALLS = 8
+
+# Spoken call message — only the names vary per call
+_TEST_PREFIX = "This is a test of the emergency alert system. "
+_MESSAGE_TEMPLATE = (
+    "{prefix}"
+    "Hello {contact}. "
+    "This is an automated alert. "
+    "{user} may have fallen and did not respond "
+    "to a check-in. Please check on them immediately and call "
+    "emergency services if needed."
+)
+_TWIML_TEMPLATE = (
+    '<Response>'
+    '<Say voice="alice">{message}</Say>'
+    '<Pause length="1"/>'
+    '<Say voice="alice">{message}</Say>'
+    '</Response>'
+)
+
 
 # Data classes
 @dataclass
@@ -98,7 +120,9 @@ class EmergencyAlerter:
             2. Mock-dispatch to emergency services (console log only).
 
         Each call is attempted independently — a failure on one contact
-        does not prevent the others from being tried.
+        does not prevent the others from being tried. Calls are placed
+        concurrently (each is a blocking HTTPS round-trip), so every
+        contact is reached after roughly one round-trip rather than N.
 
         Parameters
         ----------
@@ -112,7 +136,11 @@ class EmergencyAlerter:
             One entry per action attempted (N calls + 1 mock dispatch).
         """
         results: list[AlertResult] = []
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        # One clock read per alert sequence — the log line, the dispatch
+        # record and every AlertResult share it
+        now       = datetime.now()
+        timestamp = now.strftime("%Y-%m-%d %H:%M:%S")
+        attempted = now.isoformat()
 
         logger.warning(
             "ALERT TRIGGERED | user=%s | test=%s | time=%s",
@@ -122,12 +150,20 @@ class EmergencyAlerter:
         )
 
         # --- 1. Call all contacts ---
-        for contact in self.config.contacts:
-            result = self._make_call(contact, test_mode)
-            results.append(result)
+        contacts = self.config.contacts
+        if contacts:
+            with ThreadPoolExecutor(
+                max_workers=min(MAX_PARALLEL_CALLS, len(contacts)),
+                thread_name_prefix="alert-call",
+            ) as pool:
+                # map() keeps results in contact order
+                results.extend(pool.map(
+                    lambda contact: self._make_call(contact, test_mode, attempted),
+                    contacts,
+                ))
 
         # --- 2. Mock emergency services dispatch ---
-        result = self._mock_dispatch_emergency_services(timestamp, test_mode)
+        result = self._mock_dispatch_emergency_services(timestamp, test_mode, attempted)
         results.append(result)
 
         successes = sum(1 for r in results if r.success)
@@ -147,6 +183,7 @@ class EmergencyAlerter:
         self,
         contact: EmergencyContact,
         test_mode: bool,
+        attempted: str,
     ) -> AlertResult:
         """
         Place a single Twilio voice call to one emergency contact.
@@ -160,6 +197,8 @@ class EmergencyAlerter:
             The recipient.
         test_mode : bool
             Speaks a test label at the start of the message if True.
+        attempted : str
+            ISO-8601 timestamp of the alert sequence, stored on the result.
 
         Returns
         -------
@@ -175,32 +214,37 @@ class EmergencyAlerter:
                 to=contact.phone,
             )
             logger.info(
-                "Call placed | to=%s | sid=%s",
+                "Call placed | to=%s (%s) | sid=%s",
+                contact.name,
                 contact.phone,
                 call.sid,
             )
-            print(f"✅ Call placed to {contact.name} ({contact.phone}) | SID: {call.sid}")
-            return AlertResult(action=action, success=True)
+            return AlertResult(action=action, success=True, timestamp=attempted)
 
         except TwilioRestException as exc:
-            logger.error("Call failed | to=%s | error=%s", contact.phone, exc.msg)
-            print(f"❌ Call failed to {contact.name} ({contact.phone}): {exc.msg}")
-            return AlertResult(action=action, success=False, error=exc.msg)
+            logger.error(
+                "Call failed | to=%s (%s) | error=%s",
+                contact.name,
+                contact.phone,
+                exc.msg,
+            )
+            return AlertResult(action=action, success=False, error=exc.msg, timestamp=attempted)
 
         except Exception as exc:
             logger.error(
-                "Call unexpected error | to=%s | error=%s",
+                "Call unexpected error | to=%s (%s) | error=%s",
+                contact.name,
                 contact.phone,
                 str(exc),
                 exc_info=True,
             )
-            print(f"❌ Unexpected error calling {contact.name} ({contact.phone}): {exc}")
-            return AlertResult(action=action, success=False, error=str(exc))
+            return AlertResult(action=action, success=False, error=str(exc), timestamp=attempted)
 
     def _mock_dispatch_emergency_services(
         self,
         timestamp: str,
         test_mode: bool,
+        attempted: str,
     ) -> AlertResult:
         """
         Simulate a dispatch to emergency services (console log only).
@@ -213,6 +257,8 @@ class EmergencyAlerter:
             Human-readable timestamp for the log entry.
         test_mode : bool
             Flags the dispatch as a test in the output.
+        attempted : str
+            ISO-8601 timestamp of the alert sequence, stored on the result.
 
         Returns
         -------
@@ -238,7 +284,7 @@ class EmergencyAlerter:
             "Mock emergency services dispatch logged | user=%s",
             self.config.user_name,
         )
-        return AlertResult(action=action, success=True)
+        return AlertResult(action=action, success=True, timestamp=attempted)
 
     def _build_twiml(self, contact_name: str, test_mode: bool) -> str:
         """
@@ -259,24 +305,12 @@ class EmergencyAlerter:
         str
             A TwiML <Response> string passed directly to Twilio's API.
         """
-        test_prefix = "This is a test of the emergency alert system. " if test_mode else ""
-
-        message = (
-            f"{test_prefix}"
-            f"Hello {contact_name}. "
-            f"This is an automated alert. "
-            f"{self.config.user_name} may have fallen and did not respond "
-            f"to a check-in. Please check on them immediately and call "
-            f"emergency services if needed."
-        )
-
-        return (
-            f'<Response>'
-            f'<Say voice="alice">{message}</Say>'
-            f'<Pause length="1"/>'
-            f'<Say voice="alice">{message}</Say>'
-            f'</Response>'
+        message = _MESSAGE_TEMPLATE.format(
+            prefix=_TEST_PREFIX if test_mode else "",
+            contact=contact_name,
+            user=self.config.user_name,
         )
+        return _TWIML_TEMPLATE.format(message=message)
 
 
 # test
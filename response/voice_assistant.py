@@ -5,14 +5,19 @@ Flow:
     1. Fall confirmed by detection pipeline
     2. VoiceAssistant.run_checkin() is called
     3. TTS speaks a check-in prompt (pyttsx3, fully offline)
-    4. Mic audio is recorded for `timeout_seconds`
-    5. Audio is transcribed via pywhispercpp (fully offline, no subprocess)
-    6. Transcript is classified into UserResponse enum
+    4. Mic audio is streamed for up to `timeout_seconds`
+    5. Audio heard so far is transcribed via pywhispercpp every
+       TRANSCRIBE_EVERY_SECONDS (fully offline, no subprocess)
+    6. Each transcript is classified into UserResponse enum; listening stops
+       as soon as it is SAFE, or (with webrtcvad installed) once the user has
+       spoken and then gone quiet. HELP_NEEDED is only taken from the
+       complete reply
     7. Only if response is NO_RESPONSE does a second prompt play
     8. Final UserResponse is returned to the caller
 
 Dependencies:
-    pip install pyttsx3 sounddevice soundfile pywhispercpp
+    pip install pyttsx3 sounddevice pywhispercpp
+    pip install webrtcvad    # optional — end-of-speech detection
 
     pywhispercpp will automatically download the requested model on first run,
     or you can point it at a local ggml model file via `model` parameter.
@@ -22,16 +27,30 @@ Dependencies:
 from __future__ import annotations
 
 import logging
-import tempfile
+import os
+import re
+import string
+import sys
+import threading
 import time
 from enum import Enum
 from pathlib import Path
 
+import numpy as np
 import pyttsx3
 import sounddevice as sd
-import soundfile as sf
 from pywhispercpp.model import Model
 
+try:
+    import psutil
+except ImportError:  # optional — physical cores are estimated from os.cpu_count()
+    psutil = None
+
+try:
+    import webrtcvad
+except ImportError:  # optional — without it, listening runs until a keyword or the timeout
+    webrtcvad = None
+
 # ---------------------------------------------------------------------------
 # Logging
 # ---------------------------------------------------------------------------
@@ -82,6 +101,64 @@ HELP_KEYWORDS = [
     "i need help", "need help", "i fell",
 ]
 
+# Transcripts and keywords are compared with quotes and apostrophes (straight
+# or curly) removed, so "I'm fine" / "I’m fine" / "im fine" all look alike.
+# Other punctuation becomes "." — it still separates words, so "No. Help!"
+# can't turn into the SAFE phrase "no help".
+_QUOTES = "'\"\u2018\u2019\u201c\u201d"
+_PUNCT_TABLE = str.maketrans({
+    **dict.fromkeys(string.punctuation, "."),
+    **dict.fromkeys(_QUOTES, None),
+})
+
+
+def _normalize(text: str) -> str:
+    """Lowercase, drop quotes, unify other punctuation and collapse whitespace."""
+    return " ".join(text.lower().translate(_PUNCT_TABLE).split())
+
+
+# whisper's marker for silence, as it looks after _normalize()
+_BLANK_AUDIO = _normalize("[BLANK_AUDIO]")
+
+
+def _keyword_pattern(keywords: list[str]) -> re.Pattern:
+    # One alternation per list, so a transcript is scanned once per list
+    # instead of once per keyword. Same substring semantics as `kw in text`.
+    normalized = dict.fromkeys(_normalize(kw) for kw in keywords)
+    return re.compile("|".join(map(re.escape, normalized)))
+
+
+_SAFE_RE = _keyword_pattern(SAFE_KEYWORDS)
+_HELP_RE = _keyword_pattern(HELP_KEYWORDS)
+
+
+# Check-in replies are a few words of English: skip language detection (an
+# extra encoder pass), keep the whole reply in one segment, and don't carry
+# decoder context over from the previous transcription.
+TRANSCRIBE_PARAMS = {"language": "en", "single_segment": True, "no_context": True}
+
+# How much new audio to gather before re-running whisper on everything heard
+# so far. A reply is picked up at most this long after it is spoken, instead
+# of only once the whole listening window has elapsed.
+TRANSCRIBE_EVERY_SECONDS = 1.5
+
+# Voice-activity detection (webrtcvad). Once the user has said something,
+# listening ends after END_OF_SPEECH_SECONDS without speech. Nothing is
+# transcribed while the VAD has heard no speech at all.
+VAD_AGGRESSIVENESS    = 2      # 0 (keeps most audio as speech) .. 3 (strictest)
+VAD_FRAME_MS          = 30     # webrtcvad takes 10, 20 or 30 ms frames
+END_OF_SPEECH_SECONDS = 1.0
+
+# The preferred TTS voice ID found by the first run's voice probe. An empty
+# file means the probe ran but found no preferred voice. Delete it to re-probe.
+TTS_VOICE_CACHE = Path.home() / ".cache" / "fall_detection" / "tts_voice_id"
+
+
+def _physical_cores() -> int:
+    """Physical CPU cores — psutil if available, else half the logical count."""
+    cores = psutil.cpu_count(logical=False) if psutil is not None else None
+    return max(1, cores or (os.cpu_count() or 2) // 2)
+
 
 # ---------------------------------------------------------------------------
 # Main class
@@ -94,18 +171,22 @@ class VoiceAssistant:
     Parameters
     ----------
     whisper_model : str
-        Model name (e.g. "base.en", "tiny.en") or a direct path to a local
-        ggml model file. Named models are downloaded automatically on first use
-        and cached locally by pywhispercpp. "base.en" is recommended — it is
-        fast on CPU and accurate enough for short spoken responses.
+        Model name (e.g. "base.en-q5_1", "base.en", "tiny.en") or a direct
+        path to a local ggml model file. Named models are downloaded
+        automatically on first use and cached locally by pywhispercpp.
+        "base.en-q5_1" (5-bit quantised base.en) is recommended — it keeps
+        base.en's accuracy on short spoken responses at well under half the
+        size, and runs faster on CPU.
 
     whisper_models_dir : str | None
         Optional directory where pywhispercpp stores/looks for model files.
         Defaults to pywhispercpp's own cache directory if None.
 
-    n_threads : int
-        Number of CPU threads for whisper inference. 4 is a safe default
-        for most machines; increase on higher-core-count CPUs.
+    n_threads : int | None
+        Number of CPU threads for whisper inference. Defaults to the number
+        of physical cores, capped at 4 — whisper.cpp gets slower, not faster,
+        when spread across hyperthreads, and gains little beyond ~4 threads
+        on clips this short.
 
     timeout_seconds : int
         How long (in seconds) to listen for a response on the first prompt.
@@ -129,9 +210,9 @@ class VoiceAssistant:
 
     def __init__(
         self,
-        whisper_model: str = "base.en",
+        whisper_model: str = "base.en-q5_1",
         whisper_models_dir: str | None = None,
-        n_threads: int = 4,
+        n_threads: int | None = None,
         timeout_seconds: int = 6,
         second_chance_seconds: int = 4,
         sample_rate: int = 16000,
@@ -146,6 +227,32 @@ class VoiceAssistant:
         self._tts_volume = tts_volume
         self._tts_voice_id: str | None = None  # set during _init_tts
 
+        # pyttsx3 on macOS silently stops speaking after the first runAndWait()
+        # on a reused engine, so there a fresh engine is built per utterance.
+        # Elsewhere (espeak, SAPI5) one engine is kept for the assistant's
+        # lifetime — re-initialising costs 100–300 ms per prompt.
+        self._persist_tts = sys.platform != "darwin"
+        self._tts_engine = None
+        self._tts_lock = threading.Lock()   # runAndWait() is not re-entrant
+
+        # Microphone stream and recording buffer, both reused across prompts:
+        # the input device is opened once instead of per prompt (PulseAudio /
+        # ALSA charge 100–300 ms for the open), and the audio callback writes
+        # straight into the preallocated buffer.
+        self._rec_buf = np.empty(
+            int(max(timeout_seconds, second_chance_seconds) * sample_rate), dtype=np.float32
+        )
+        self._rec_n = 0       # samples written to _rec_buf so far (audio thread)
+        self._stream = None   # opened at the end of __init__ by _input_stream()
+
+        # webrtcvad only handles 8/16/32/48 kHz
+        self._vad = None
+        if webrtcvad is not None and sample_rate in (8000, 16000, 32000, 48000):
+            self._vad = webrtcvad.Vad(VAD_AGGRESSIVENESS)
+
+        if n_threads is None:
+            n_threads = min(4, _physical_cores())
+
         # --- Load whisper model via pywhispercpp ---
         # Loaded once and reused — avoids cold-start cost on each check-in.
         logger.info("Loading whisper model '%s' (this may take a moment)...", whisper_model)
@@ -158,11 +265,28 @@ class VoiceAssistant:
         )
         logger.info("Whisper model loaded.")
 
-        # Probe available voices once and store the preferred voice ID.
-        # speak() re-initializes the engine each call (macOS pyttsx3 bug fix),
-        # so we can't store the engine instance long-term.
+        # Run one throwaway inference on 1 s of silence so the first real
+        # check-in doesn't pay the one-off cost of faulting in the weights
+        # and spinning up whisper's thread pool.
+        try:
+            start = time.perf_counter()
+            self._transcribe(np.zeros(sample_rate, dtype=np.float32))
+            logger.info("Whisper warm-up took %.2fs.", time.perf_counter() - start)
+        except Exception as exc:
+            logger.warning("Whisper warm-up failed: %s", exc)
+
+        # Probe available voices once and store the preferred voice ID
+        # (and, off macOS, the configured engine itself).
         self._init_tts()
 
+        # Open the microphone now, alongside the other start-up work, so the
+        # first check-in goes straight from the prompt to recording. If this
+        # fails, _listen_and_classify() retries the open.
+        try:
+            self._input_stream()
+        except Exception as exc:
+            logger.warning("Could not open microphone yet: %s", exc)
+
         logger.info(
             "VoiceAssistant initialized | model=%s | timeout=%ds",
             whisper_model,
@@ -240,9 +364,10 @@ class VoiceAssistant:
         """
         Speak a message aloud using pyttsx3.
 
-        A fresh engine is created for each call. This works around a known
-        macOS bug where pyttsx3 silently fails on runAndWait() calls after
-        the first one when reusing the same engine instance.
+        On macOS a fresh engine is created for each call. This works around a
+        known bug where pyttsx3 silently fails on runAndWait() calls after
+        the first one when reusing the same engine instance. On other
+        platforms the engine built in _init_tts() is reused.
 
         Parameters
         ----------
@@ -250,17 +375,23 @@ class VoiceAssistant:
             The text to speak.
         """
         logger.info("Speaking: %s", message)
-        try:
-            engine = pyttsx3.init()
-            engine.setProperty("rate", self._tts_rate)
-            engine.setProperty("volume", self._tts_volume)
-            if self._tts_voice_id:
-                engine.setProperty("voice", self._tts_voice_id)
-            engine.say(message)
-            engine.runAndWait()
-            engine.stop()
-        except Exception as exc:
-            logger.error("TTS failed: %s", exc, exc_info=True)
+        with self._tts_lock:
+            try:
+                engine = self._tts_engine or self._make_tts_engine()
+                engine.say(message)
+                engine.runAndWait()
+                if self._persist_tts:
+                    self._tts_engine = engine
+                else:
+                    engine.stop()
+            except Exception as exc:
+                # Drop a persistent engine that failed so the next call rebuilds it
+                self._tts_engine = None
+                logger.error("TTS failed: %s", exc, exc_info=True)
+
+    def close(self) -> None:
+        """Release the microphone. A later check-in reopens it."""
+        self._close_stream()
 
     # -----------------------------------------------------------------------
     # Internal helpers
@@ -268,11 +399,23 @@ class VoiceAssistant:
 
     def _init_tts(self) -> None:
         """
-        Probe pyttsx3 once to find and store the preferred voice ID.
-        The ID is reused in every speak() call without keeping an engine
-        instance alive between calls.
+        Find the preferred voice ID: read it from TTS_VOICE_CACHE, or probe
+        pyttsx3's voice list (50–200 ms on espeak / SAPI5) and cache the result.
+        Off macOS the engine is configured and kept for speak();
+        on macOS only the ID is kept and each speak() builds its own engine.
         """
         try:
+            cached = TTS_VOICE_CACHE.read_text(encoding="utf-8").strip()
+        except OSError:
+            cached = None
+
+        try:
+            if cached is not None:
+                self._tts_voice_id = cached or None
+                if self._persist_tts:
+                    self._tts_engine = self._make_tts_engine()
+                return
+
             engine = pyttsx3.init()
             voices = engine.getProperty("voices")
             for voice in voices:
@@ -280,33 +423,119 @@ class VoiceAssistant:
                     self._tts_voice_id = voice.id
                     logger.debug("Preferred TTS voice: %s", voice.name)
                     break
-            engine.stop()
+            try:
+                TTS_VOICE_CACHE.parent.mkdir(parents=True, exist_ok=True)
+                TTS_VOICE_CACHE.write_text(self._tts_voice_id or "", encoding="utf-8")
+            except OSError as exc:
+                logger.debug("Could not cache TTS voice: %s", exc)
+            if self._persist_tts:
+                self._tts_engine = self._configure_tts(engine)
+            else:
+                engine.stop()
         except Exception as exc:
             logger.debug("Could not probe TTS voices: %s", exc)
 
+    def _make_tts_engine(self):
+        """Create a pyttsx3 engine with the configured rate, volume and voice."""
+        return self._configure_tts(pyttsx3.init())
+
+    def _configure_tts(self, engine):
+        engine.setProperty("rate", self._tts_rate)
+        engine.setProperty("volume", self._tts_volume)
+        if self._tts_voice_id:
+            try:
+                engine.setProperty("voice", self._tts_voice_id)
+            except Exception as exc:
+                # Cached voice no longer installed — use the default voice and
+                # re-probe on the next start
+                logger.warning("TTS voice %s unavailable: %s", self._tts_voice_id, exc)
+                self._tts_voice_id = None
+                TTS_VOICE_CACHE.unlink(missing_ok=True)
+        return engine
+
     def _listen_and_classify(self, duration: int) -> UserResponse:
         """
-        Record audio for `duration` seconds, transcribe with pywhispercpp,
-        and classify the result. Temp file is always cleaned up.
+        Stream microphone audio for up to `duration` seconds, transcribing
+        what has been heard so far every TRANSCRIBE_EVERY_SECONDS. Returns as
+        soon as a transcript classifies as SAFE; otherwise the full recording
+        is classified once the window closes. With a VAD, partial passes wait
+        for speech, and the window closes early once the user stops talking.
+        Audio stays in memory — nothing is written to disk.
+
+        Only SAFE may end listening early: keywords match by substring, so a
+        cut-off "please don't call anyone" or "yes, I'm fine" reads as
+        HELP_NEEDED until the rest arrives, while a longer transcript still
+        contains any SAFE phrase a partial one did.
 
         Parameters
         ----------
         duration : int
-            Recording duration in seconds.
+            Maximum listening time in seconds.
 
         Returns
         -------
         UserResponse
         """
-        tmp_path = None
-        try:
-            with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as f:
-                tmp_path = f.name
+        step = int(TRANSCRIBE_EVERY_SECONDS * self.sample_rate)
+        n_transcribed = 0  # samples covered by the last whisper pass
+        response = UserResponse.NO_RESPONSE  # its classification
+
+        vad = self._vad
+        vad_frame = self.sample_rate * VAD_FRAME_MS // 1000
+        end_of_speech = int(END_OF_SPEECH_SECONDS * self.sample_rate)
+        vad_pos = 0          # samples already run through the VAD
+        speech_seen = False
+        silent = 0           # samples since the last speech frame
 
-            logger.info("Recording audio for %d seconds -> %s", duration, tmp_path)
-            self._record_audio(duration=duration, filepath=tmp_path)
+        if len(self._rec_buf) < duration * self.sample_rate:
+            self._rec_buf = np.empty(int(duration * self.sample_rate), dtype=np.float32)
 
-            transcript = self._transcribe(audio_path=tmp_path)
+        try:
+            logger.info("Listening for up to %d seconds", duration)
+            stream = self._input_stream()
+            self._rec_n = 0
+            stream.start()
+            try:
+                deadline = time.monotonic() + duration
+                while (remaining := deadline - time.monotonic()) > 0:
+                    time.sleep(min(0.1, remaining))
+                    # The callback only writes past _rec_n, so this prefix is stable
+                    n_heard = self._rec_n
+
+                    if vad is not None:
+                        while vad_pos + vad_frame <= n_heard:
+                            frame = self._rec_buf[vad_pos:vad_pos + vad_frame]
+                            pcm = (frame * 32767).astype(np.int16).tobytes()
+                            if vad.is_speech(pcm, self.sample_rate):
+                                speech_seen, silent = True, 0
+                            else:
+                                silent += vad_frame
+                            vad_pos += vad_frame
+                        if not speech_seen:
+                            continue  # nothing said yet — no point running whisper
+                        if silent >= end_of_speech:
+                            logger.info("End of speech detected — stopping early.")
+                            break
+
+                    if n_heard - n_transcribed < step:
+                        continue
+
+                    n_transcribed = n_heard
+                    transcript = self._transcribe(self._rec_buf[:n_heard])
+                    response = self._classify_response(transcript)
+                    if response == UserResponse.SAFE:
+                        logger.info("Whisper transcript: '%s'", transcript)
+                        return response
+            finally:
+                stream.stop()
+
+            n_heard = self._rec_n
+            if n_heard == n_transcribed:
+                # Nothing new since the last partial pass — it already
+                # covered the complete recording
+                return response
+
+            transcript = self._transcribe(self._rec_buf[:n_heard])
             logger.info("Whisper transcript: '%s'", transcript)
 
             return self._classify_response(transcript)
@@ -314,49 +543,56 @@ class VoiceAssistant:
         except Exception as exc:
             # Any failure in the audio pipeline defaults to NO_RESPONSE,
             # which triggers the emergency alert — the safest fallback.
+            # The stream is dropped so the next prompt reopens the device.
             logger.error("Error in listen/classify pipeline: %s", exc, exc_info=True)
+            self._close_stream()
             return UserResponse.NO_RESPONSE
 
-        finally:
-            if tmp_path:
-                Path(tmp_path).unlink(missing_ok=True)
-
-    def _record_audio(self, duration: int, filepath: str) -> None:
-        """
-        Record mono 16kHz audio from the default input device.
-
-        Parameters
-        ----------
-        duration : int
-            Number of seconds to record.
-        filepath : str
-            Destination .wav file path.
-        """
-        audio = sd.rec(
-            frames=int(duration * self.sample_rate),
-            samplerate=self.sample_rate,
-            channels=1,
-            dtype="int16",
-        )
-        sd.wait()
-        sf.write(filepath, audio, self.sample_rate)
-        logger.debug("Audio saved to %s", filepath)
-
-    def _transcribe(self, audio_path: str) -> str:
+    def _input_stream(self) -> sd.InputStream:
+        """The shared (stopped) microphone stream, opened in __init__ or on first use."""
+        if self._stream is None:
+            self._stream = sd.InputStream(
+                samplerate=self.sample_rate,
+                channels=1,
+                dtype="float32",
+                blocksize=self.sample_rate // 10,
+                callback=self._on_audio,
+            )
+        return self._stream
+
+    def _on_audio(self, indata, frames, time_info, status) -> None:
+        """sounddevice callback (audio thread): append samples to _rec_buf."""
+        if status:
+            logger.debug("Audio input status: %s", status)
+        n = self._rec_n
+        take = min(frames, len(self._rec_buf) - n)
+        self._rec_buf[n:n + take] = indata[:take, 0]
+        self._rec_n = n + take
+
+    def _close_stream(self) -> None:
+        """Close and forget the shared microphone stream, if open."""
+        if self._stream is not None:
+            try:
+                self._stream.close()
+            except Exception as exc:
+                logger.debug("Could not close input stream: %s", exc)
+            self._stream = None
+
+    def _transcribe(self, samples: np.ndarray) -> str:
         """
-        Transcribe an audio file using pywhispercpp (in-process, fully offline).
+        Transcribe recorded audio using pywhispercpp (in-process, fully offline).
 
         Parameters
         ----------
-        audio_path : str
-            Path to the .wav file to transcribe.
+        samples : np.ndarray
+            1-D float32 samples in [-1, 1) at `sample_rate`.
 
         Returns
         -------
         str
             Lowercased transcript text, or empty string on failure.
         """
-        segments = self._whisper.transcribe(audio_path)
+        segments = self._whisper.transcribe(samples, **TRANSCRIBE_PARAMS)
         transcript = " ".join(seg.text for seg in segments).strip().lower()
         return transcript
 
@@ -370,19 +606,21 @@ class VoiceAssistant:
         Parameters
         ----------
         transcript : str
-            Lowercased transcript from whisper.
+            Transcript from whisper. Case, punctuation and [BLANK_AUDIO]
+            markers are ignored.
 
         Returns
         -------
         UserResponse
         """
-        if not transcript or transcript == "[blank_audio]":
+        transcript = _normalize(transcript).replace(_BLANK_AUDIO, "")
+        if not transcript.strip(". "):
             return UserResponse.NO_RESPONSE
 
-        if any(keyword in transcript for keyword in SAFE_KEYWORDS):
+        if _SAFE_RE.search(transcript):
             return UserResponse.SAFE
 
-        if any(keyword in transcript for keyword in HELP_KEYWORDS):
+        if _HELP_RE.search(transcript):
             return UserResponse.HELP_NEEDED
 
         return UserResponse.NO_RESPONSE
@@ -391,12 +629,12 @@ class VoiceAssistant:
 
 # test
 if __name__ == "__main__":
-    print("Loading VoiceAssistant with model 'base.en'...")
+    print("Loading VoiceAssistant with model 'base.en-q5_1'...")
     print("Starting test check-in in 3 seconds...")
     time.sleep(3)
 
     assistant = VoiceAssistant(
-        whisper_model="base.en",
+        whisper_model="base.en-q5_1",
         timeout_seconds=12,
         second_chance_seconds=7,
     )
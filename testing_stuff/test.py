@@ -1,4 +1,6 @@
 import cv2
+import queue
+import threading
 import mediapipe as mp
 import numpy as np
 
@@ -7,6 +9,32 @@ mp_drawing = mp.solutions.drawing_utils
 pose = mp_pose.Pose(static_image_mode=False, min_detection_confidence=0.5)
 
 cap = cv2.VideoCapture(0)
+# MJPEG at 640x480 with a one-frame buffer — less USB/decode work, no stale frames
+cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'MJPG'))
+cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
+cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
+cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+
+# Pose runs on a worker thread so the next frame is captured while the
+# current one is being inferred. Frames are dropped when the worker is busy.
+in_q  = queue.Queue(maxsize=2)
+out_q = queue.Queue(maxsize=2)
+
+
+def pose_worker():
+    rgb = None   # reused BGR->RGB buffer — only this thread touches it
+    while True:
+        frame = in_q.get()
+        if frame is None:
+            break
+        if rgb is None or rgb.shape != frame.shape:
+            rgb = np.empty_like(frame)
+        cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=rgb)
+        out_q.put((frame, pose.process(rgb)))
+
+
+worker = threading.Thread(target=pose_worker, daemon=True)
+worker.start()
 
 while True:
     ret, frame = cap.read()
@@ -14,30 +42,44 @@ while True:
         print("Can't read from webcam")
         break
 
-    rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-    results = pose.process(rgb)
+    try:
+        in_q.put_nowait(frame)
+    except queue.Full:
+        pass  # worker is behind — drop this frame
+
+    # Show whichever frame the worker finished last, if any
+    try:
+        shown, results = out_q.get_nowait()
+    except queue.Empty:
+        shown = None
 
-    if results.pose_landmarks:
-        # Draw the skeleton on the frame
-        mp_drawing.draw_landmarks(
-            frame,
-            results.pose_landmarks,
-            mp_pose.POSE_CONNECTIONS  # draws the lines connecting joints
-        )
+    if shown is not None:
+        if results.pose_landmarks:
+            # Draw the skeleton on the frame
+            mp_drawing.draw_landmarks(
+                shown,
+                results.pose_landmarks,
+                mp_pose.POSE_CONNECTIONS  # draws the lines connecting joints
+            )
 
-        # Print hip positions in the terminal
-        lm = results.pose_landmarks.landmark
-        hip_y = (lm[23].y + lm[24].y) / 2.0
-        print(f"Hip Y: {hip_y:.3f}  (0=top of frame, 1=bottom)", end='\r')
+            # Print hip positions in the terminal
+            lm = results.pose_landmarks.landmark
+            hip_y = (lm[23].y + lm[24].y) / 2.0
+            print(f"Hip Y: {hip_y:.3f}  (0=top of frame, 1=bottom)", end='\r')
 
-    else:
-        cv2.putText(frame, "No pose detected", (50, 50),
-                    cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
+        else:
+            cv2.putText(shown, "No pose detected", (50, 50),
+                        cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
 
-    cv2.imshow('Press Q to quit', frame)
+        cv2.imshow('Press Q to quit', shown)
 
     if cv2.waitKey(1) & 0xFF == ord('q'):
         break
 
+# Stop the worker; if it's stuck on a full out_q it dies with the process (daemon)
+try:
+    in_q.put_nowait(None)
+except queue.Full:
+    pass
 cap.release()
 cv2.destroyAllWindows()
\ No newline at end of file
@@ -1,10 +1,18 @@
 # test_live.py
 
+import os
+# Keep MediaPipe's and the BLAS thread pools from oversubscribing the CPU —
+# these caps only take effect if set before numpy/mediapipe are imported
+os.environ.setdefault("OMP_NUM_THREADS", "2")
+os.environ.setdefault("MKL_NUM_THREADS", "2")
 import sys
 import cv2
 import time
+import queue
+import threading
 import numpy as np
 from pathlib import Path
+from functools import lru_cache
 
 sys.path.append(str(Path(__file__).resolve().parent.parent))
 
@@ -18,46 +26,132 @@ mp_pose    = mp.solutions.pose
 
 WINDOW_STEP = WINDOW_SIZE // 5
 
+STATE_COLORS = {
+    'warming_up': (128, 128, 128),
+    'no_fall':    (0, 200, 0),
+    'confirming': (0, 165, 255),
+    'fall':       (0, 0, 255),
+}
+
+# 'warming_up' shows a live frame count, so it is formatted in the loop
+STATUS_TEXT = {
+    'no_fall':    'WATCHING — No Fall',
+    'confirming': 'CONFIRMING...',
+    'fall':       '*** FALL DETECTED ***',
+}
+
+STATUS_BAR_H = 61   # rows covered by cv2.rectangle((0, 0), (w, 60)) — end point is inclusive
+
+
+def draw_status_bar(frame, color, text):
+    h, w = frame.shape[:2]
+    cv2.rectangle(frame, (0, 0), (w, STATUS_BAR_H - 1), color, -1)
+    cv2.putText(frame, text, (10, 42),
+                cv2.FONT_HERSHEY_SIMPLEX, 1.2, (255, 255, 255), 2)
+
+
+@lru_cache(maxsize=None)
+def status_strip(state, width):
+    """
+    Pre-rendered status bar for a fixed-text state — rendered once per
+    (state, width), then copied onto each frame instead of redrawn.
+    """
+    strip = np.empty((STATUS_BAR_H, width, 3), np.uint8)
+    draw_status_bar(strip, STATE_COLORS.get(state, (128, 128, 128)), STATUS_TEXT.get(state, state))
+    return strip
+
+
+def capture_loop(cap, frames, stop, drop_stale):
+    """
+    Producer thread: reads frames into `frames` so the next camera read
+    overlaps inference on the current frame. Puts None when the source ends.
+    drop_stale: for a live camera, replace the queued frame instead of
+                waiting when the consumer is behind (video files keep
+                every frame).
+    """
+    while not stop.is_set():
+        ret, frame = cap.read()
+        if not ret:
+            frame = None
+        if drop_stale and frame is not None:
+            while True:
+                try:
+                    frames.put_nowait(frame)
+                    break
+                except queue.Full:
+                    try:
+                        frames.get_nowait()
+                    except queue.Empty:
+                        pass
+        else:
+            while not stop.is_set():
+                try:
+                    frames.put(frame, timeout=0.1)
+                    break
+                except queue.Full:
+                    pass
+        if frame is None:
+            break
+
 
 def run(source=0):
+    # The OpenCV work here (colour conversion, text, rectangles) is too small
+    # to be worth OpenCV's own thread pool
+    cv2.setNumThreads(1)
+
     pose       = mp_pose.Pose(static_image_mode=False, model_complexity=1,
                                min_detection_confidence=0.5, min_tracking_confidence=0.5)
     engineer   = FeatureEngineer()
     classifier = FallClassifier()
-    logger     = EventLogger(fps=15)
+    logger     = EventLogger(fps=15, on_saved=lambda path: print(f"\nClip saved → {path}"))
 
     cap = cv2.VideoCapture(source)
     if not cap.isOpened():
         print(f"ERROR: Could not open source: {source}")
         return
+    if not isinstance(source, str):
+        # Keep at most one frame queued in the driver — a deeper buffer only
+        # hands us frames that are already stale
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+
+    # One slot: for a live camera the loop always gets the newest frame
+    frames  = queue.Queue(maxsize=1)
+    stop    = threading.Event()
+    capture = threading.Thread(target=capture_loop, daemon=True,
+                               args=(cap, frames, stop, not isinstance(source, str)))
+    capture.start()
 
     print("Running — press Q to quit")
     print("Status bar: WARMING UP → WATCHING → CONFIRMING... → *** FALL DETECTED ***")
 
-    STATE_COLORS = {
-        'warming_up': (128, 128, 128),
-        'no_fall':    (0, 200, 0),
-        'confirming': (0, 165, 255),
-        'fall':       (0, 0, 255),
-    }
-
     fall_time     = None
     state         = 'warming_up'
     frame_count   = 0
     last_emission = -WINDOW_STEP
+    black_frame   = None
+    rgb           = None   # reused BGR→RGB buffer for MediaPipe
 
     while True:
-        ret, frame = cap.read()
-        if not ret:
+        frame = frames.get()
+        if frame is None:
             print("Video ended." if isinstance(source, str) else "Webcam read failed.")
             break
 
         frame_count += 1
 
         # --- Process frame ONCE ---
-        rgb     = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        if rgb is None or rgb.shape != frame.shape:
+            rgb = np.empty_like(frame)
+        cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=rgb)
         results = pose.process(rgb)
 
+        # Black canvas for the saved clip, reused every frame — add_frame()
+        # copies it into the logger's ring, so clearing it in place is safe
+        if black_frame is None or black_frame.shape != frame.shape:
+            black_frame = np.zeros_like(frame)
+        else:
+            black_frame.fill(0)
+
         if results.pose_landmarks:
             # Extract landmarks for feature engineering
             landmarks = np.array([[lm.x, lm.y, lm.z, lm.visibility]
@@ -73,7 +167,6 @@ def run(source=0):
             )
 
             # Draw skeleton on black canvas for saving — no background, no person
-            black_frame = np.zeros_like(frame)
             mp_drawing.draw_landmarks(
                 black_frame,
                 results.pose_landmarks,
@@ -82,29 +175,28 @@ def run(source=0):
                 mp_drawing.DrawingSpec(color=(255, 255, 255), thickness=2)
             )
         else:
-            landmarks   = None
-            black_frame = np.zeros_like(frame)
+            landmarks = None
 
         # --- Buffer black frame for saving (skeleton only, no background) ---
-        saved_path = logger.add_frame(black_frame)
-        if saved_path:
-            print(f"\nClip saved → {saved_path}")
+        logger.add_frame(black_frame)
 
-        # --- Feature extraction ---
-        flat_features = engineer.compute(landmarks)
+        # --- Feature extraction — the window advances every frame, but the
+        # flat vector is only built on frames that get classified ---
+        engineer.compute(landmarks, flatten=False)
+        window_ready = landmarks is not None and engineer.is_full
 
         # --- Only run classifier every WINDOW_STEP frames ---
         frames_since_last = frame_count - last_emission
         should_predict = (
-            flat_features is not None and
+            window_ready and
             frames_since_last >= WINDOW_STEP
         )
 
-        if flat_features is None:
+        if not window_ready:
             state = 'warming_up'
         elif should_predict:
             last_emission = frame_count
-            result        = classifier.predict(flat_features)
+            result        = classifier.predict(engineer.window())
 
             if result == 'fall':
                 state     = 'fall'
@@ -122,23 +214,19 @@ def run(source=0):
                 state = 'no_fall'
 
         # --- Draw status bar on live display frame ---
-        color = STATE_COLORS.get(state, (128, 128, 128))
-        h, w  = frame.shape[:2]
-
-        cv2.rectangle(frame, (0, 0), (w, 60), color, -1)
+        h, w = frame.shape[:2]
 
-        status_text = {
-            'warming_up': f'WARMING UP ({frame_count}/{WINDOW_SIZE} frames)',
-            'no_fall':    'WATCHING — No Fall',
-            'confirming': 'CONFIRMING...',
-            'fall':       '*** FALL DETECTED ***',
-        }.get(state, state)
-
-        cv2.putText(frame, status_text, (10, 42),
-                    cv2.FONT_HERSHEY_SIMPLEX, 1.2, (255, 255, 255), 2)
+        if state == 'warming_up':
+            # Live frame count — can't be cached, drawn directly
+            draw_status_bar(frame, STATE_COLORS['warming_up'],
+                            f'WARMING UP ({frame_count}/{WINDOW_SIZE} frames)')
+        else:
+            frame[:STATUS_BAR_H] = status_strip(state, w)
 
         if landmarks is not None:
-            hip_y = (landmarks[23, 1] + landmarks[24, 1]) / 2.0
+            # One slice to plain floats — formats without numpy scalar overhead
+            left_hip_y, right_hip_y = landmarks[23:25, 1].tolist()
+            hip_y = (left_hip_y + right_hip_y) / 2.0
             cv2.putText(frame,
                         f'hip_y: {hip_y:.3f}  |  next prediction in: {WINDOW_STEP - frames_since_last} frames',
                         (10, h - 15),
@@ -157,9 +245,12 @@ def run(source=0):
         if cv2.waitKey(1) & 0xFF == ord('q'):
             break
 
+    stop.set()
+    capture.join(timeout=1.0)
     cap.release()
     cv2.destroyAllWindows()
     pose.close()
+    logger.close()   # finish any clip still being written
     print("\nDone.")
 
 
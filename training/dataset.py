@@ -0,0 +1,40 @@
+# training/dataset.py
+"""
+Where the extracted window features live, and how to load them.
+
+extract_keypoints.py writes FEATURES_PATH as Parquet (typed columns, zstd
+compressed, and readers can load just the columns they need). A dataset
+extracted before the switch is still read from LEGACY_CSV_PATH if no
+Parquet file exists yet.
+
+Requires:
+    pip install pyarrow
+"""
+
+from pathlib import Path
+
+import pandas as pd
+
+FEATURES_PATH   = Path('training/data/keypoints_features.parquet')
+LEGACY_CSV_PATH = Path('training/data/keypoints_features.csv')
+
+
+def load_features(columns=None, videos=None):
+    """
+    Load the feature table, optionally just `columns` and just the rows whose
+    'video' is in `videos`. Rows keep their file order either way.
+    """
+    if FEATURES_PATH.exists():
+        # Row filter is pushed down to the reader, so rows of other videos are
+        # never materialised
+        filters = None if videos is None else [('video', 'in', list(videos))]
+        return pd.read_parquet(FEATURES_PATH, columns=columns, filters=filters, engine='pyarrow')
+
+    if videos is None:
+        return pd.read_csv(LEGACY_CSV_PATH, usecols=columns)
+    # The CSV can't skip rows by value — stream it and keep the matching ones
+    videos = set(videos)
+    usecols = None if columns is None else list(dict.fromkeys(['video'] + list(columns)))
+    chunks = pd.read_csv(LEGACY_CSV_PATH, usecols=usecols, chunksize=10_000)
+    df = pd.concat([chunk[chunk['video'].isin(videos)] for chunk in chunks], ignore_index=True)
+    return df if columns is None else df[list(columns)]
@@ -1,15 +1,17 @@
 # training/evaluate_model.py
 import sys
-import pandas as pd
 import numpy as np
-import pickle
+import joblib
 from pathlib import Path
+import matplotlib
+matplotlib.use('Agg')  # headless — the plot only goes to a PNG
 import matplotlib.pyplot as plt
 
 # Must come before detection imports
 sys.path.append(str(Path(__file__).resolve().parent.parent))
 
-from fall_detection.rf_based.feature_engineer import FEATURE_COLS
+from fall_detection.feature_engineer import FEATURE_COLS
+from training.dataset import load_features
 
 from sklearn.metrics import (
     confusion_matrix, ConfusionMatrixDisplay,
@@ -18,33 +20,35 @@ from sklearn.metrics import (
 )
 from sklearn.model_selection import GroupShuffleSplit
 
-CSV_PATH   = Path('training/data/keypoints_features.csv')
-MODEL_PATH = Path('detection/models/classifier.pkl')
+MODEL_PATH = Path('fall_detection/models/classifier.pkl')
 
 def evaluate():
-    df = pd.read_csv(CSV_PATH)
-    X = df[FEATURE_COLS].values
-    y = df['label'].values
-    groups = df['video'].values
+    # Same group split as train_model.py, computed from the video column
+    # alone — only the held-out videos' features are then read
+    groups = load_features(['video'])['video'].values
+    splitter = GroupShuffleSplit(n_splits=1, test_size=0.2, random_state=42)
+    _, test_idx = next(splitter.split(groups, groups=groups))
 
-    with open(MODEL_PATH, 'rb') as f:
-        saved = pickle.load(f)
-    pipeline = saved['pipeline']
+    df = load_features(['label'] + FEATURE_COLS, videos=np.unique(groups[test_idx]))
+    X_test = df[FEATURE_COLS].to_numpy(dtype=np.float32)
+    y_test = df['label'].values
 
-    splitter = GroupShuffleSplit(n_splits=1, test_size=0.2, random_state=42)
-    _, test_idx = next(splitter.split(X, y, groups))
-    X_test, y_test = X[test_idx], y[test_idx]
+    saved = joblib.load(MODEL_PATH)
+    # Older pickles hold a scaler + clf Pipeline under 'pipeline'
+    model = saved['clf'] if 'clf' in saved else saved['pipeline']
 
-    y_proba = pipeline.predict_proba(X_test)[:, 1]
+    y_proba = model.predict_proba(X_test)[:, 1]
 
     auc = roc_auc_score(y_test, y_proba)
     print(f"ROC AUC: {auc:.4f}")
 
     precision, recall, thresholds = precision_recall_curve(y_test, y_proba)
     target_recall = 0.95
-    valid = recall[:-1] >= target_recall
-    if valid.any():
-        best_idx = np.where(valid)[0][np.argmax(precision[:-1][valid])]
+    # Best precision among thresholds that reach the target recall, in one
+    # pass: thresholds that miss the target recall are masked to -inf
+    masked = np.where(recall[:-1] >= target_recall, precision[:-1], -np.inf)
+    best_idx = int(masked.argmax())
+    if masked[best_idx] != -np.inf:
         best_threshold = thresholds[best_idx]
         print(f"\nAt recall >= {target_recall}:")
         print(f"  Threshold: {best_threshold:.3f}")
@@ -69,15 +73,16 @@ def evaluate():
     ConfusionMatrixDisplay(cm, display_labels=['non_fall', 'fall']).plot(ax=axes[1])
     axes[1].set_title(f'Confusion Matrix (threshold={best_threshold:.3f})')
 
-    plt.tight_layout()
-    plt.savefig('training/evaluation_results.png', dpi=150)
+    # Fixed margins (what tight_layout picks for this layout) instead of
+    # tight_layout's extra measuring draw
+    fig.subplots_adjust(left=0.06, right=0.98, bottom=0.15, top=0.91, wspace=0.15)
+    fig.savefig('training/evaluation_results.png', dpi=150)
+    plt.close(fig)
     print("\nPlot saved to training/evaluation_results.png")
 
-    with open(MODEL_PATH, 'rb') as f:
-        saved = pickle.load(f)
+    # Reuse the dict loaded above rather than unpickling the model again
     saved['threshold'] = best_threshold
-    with open(MODEL_PATH, 'wb') as f:
-        pickle.dump(saved, f)
+    joblib.dump(saved, MODEL_PATH, compress=3)
     print(f"Threshold {best_threshold:.3f} written back to {MODEL_PATH}")
 
 if __name__ == '__main__':
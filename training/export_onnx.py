@@ -0,0 +1,78 @@
+# training/export_onnx.py
+"""
+Exports the trained sklearn classifier in classifier.pkl to ONNX so that
+FallClassifier can run it through onnxruntime instead of sklearn.
+
+sklearn's predict_proba spends most of a single-row call on input
+validation and joblib dispatch; onnxruntime walks the same trees in one
+native call.
+
+train_model.py pickles the bare classifier, which is exported as-is.
+Older pickles hold a StandardScaler + forest Pipeline; the scaler is
+folded into the forest's split thresholds before export (a split on
+scaled x <= t is a split on raw x <= t*scale + mean), so the exported
+graph is still a single TreeEnsembleClassifier on raw features.
+Weight quantisation (onnxruntime.quantization) is not used — it only
+rewrites MatMul/Conv weights and leaves tree ensembles untouched.
+
+Usage:
+    python training/export_onnx.py
+
+Requires (export time only):
+    pip install skl2onnx
+"""
+
+import sys
+import copy
+import joblib
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from fall_detection.feature_engineer import FEATURE_COLS
+
+MODEL_PATH = Path('fall_detection/models/classifier.pkl')
+
+
+def fold_scaler(pipeline):
+    """
+    Return a copy of the pipeline's forest whose split thresholds are in raw
+    feature units, so it can be used without the StandardScaler step.
+    """
+    scaler = pipeline.named_steps['scaler']
+    forest = copy.deepcopy(pipeline.named_steps['clf'])
+    for tree in forest.estimators_:
+        t     = tree.tree_
+        split = t.feature >= 0          # leaves have feature == -2
+        feat  = t.feature[split]
+        t.threshold[split] = t.threshold[split] * scaler.scale_[feat] + scaler.mean_[feat]
+    return forest
+
+
+def export_onnx(model_path=MODEL_PATH):
+    """Convert the pickled classifier to <model_path>.onnx. Returns the output path."""
+    from skl2onnx import convert_sklearn
+    from skl2onnx.common.data_types import FloatTensorType
+
+    saved = joblib.load(model_path)
+    if 'clf' in saved:
+        model = saved['clf']
+    else:
+        model = fold_scaler(saved['pipeline'])
+
+    # zipmap=False -> probabilities come back as a plain [N, 2] float tensor
+    onx = convert_sklearn(
+        model,
+        initial_types=[('X', FloatTensorType([None, len(FEATURE_COLS)]))],
+        options={id(model): {'zipmap': False}},
+    )
+
+    onnx_path = Path(model_path).with_suffix('.onnx')
+    with open(onnx_path, 'wb') as f:
+        f.write(onx.SerializeToString())
+    print(f"ONNX model saved to {onnx_path}")
+    return onnx_path
+
+
+if __name__ == '__main__':
+    export_onnx()
@@ -1,36 +1,51 @@
 # training/extract_keypoints.py
 
+import os
 import cv2
-import csv
 import sys
+import queue
+import threading
+import multiprocessing as mp
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
 from pathlib import Path
 from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 
 sys.path.append(str(Path(__file__).resolve().parent.parent))
 
-from fall_detection.pose_estimator import PoseEstimator
+from fall_detection.pose_estimator import PoseEstimator, MODEL_COMPLEXITY, TARGET_WIDTH
 from fall_detection.feature_engineer import FeatureEngineer, FEATURE_COLS, WINDOW_SIZE
+from training.dataset import FEATURES_PATH
 
 # ---- Configuration -------------------------------------------------------
 DATASETS = {
     'le2i': Path('training/data/le2i'),
 }
-OUTPUT_CSV    = Path('training/data/keypoints_features.csv')
 MIN_POSE_RATE = 0.80  # skip videos where pose detected in fewer than 80% of frames
+VIDEO_EXTS    = {'.mp4', '.avi', '.mov'}
 
+# Per-video landmarks from earlier runs, so re-extracting features after a
+# feature_engineer change skips decoding and MediaPipe. One [T, 33, 4] float32
+# .npy per video, NaN rows for frames with no usable pose. Keyed by the
+# estimator settings, so changing them re-runs pose estimation.
+POSE_CACHE_DIR = Path('training/data/pose_cache') / f'c{MODEL_COMPLEXITY}_w{TARGET_WIDTH}'
 
-# ---- Window labeling -----------------------------------------------------
+# Decoded frames a reader thread may buffer ahead of pose estimation
+READ_AHEAD = 16
 
-def label_window(frame_labels_in_window):
-    """
-    A window is labeled as 'fall' if MORE THAN HALF its frames are fall frames.
-    This prevents a window that merely clips the edge of a fall from being
-    labeled as a fall window — the fall has to actually dominate the window.
-    """
-    fall_count = sum(frame_labels_in_window)
-    return 1 if fall_count > (len(frame_labels_in_window) / 2) else 0
+# One row per window. Each video is written as its own row group as soon as
+# it is processed, so memory use doesn't grow with the dataset.
+SCHEMA = pa.schema(
+    [('dataset', pa.string()), ('video', pa.string()),
+     ('window_end_frame', pa.int32()), ('label', pa.int8())]
+    + [(col, pa.float32()) for col in FEATURE_COLS]
+)
 
 
+# ---- Window labeling -----------------------------------------------------
+
 def get_frame_labels_le2i(total_frames, is_fall_video):
     """
     Le2i has no frame-level annotations, so we estimate:
@@ -40,27 +55,33 @@ def get_frame_labels_le2i(total_frames, is_fall_video):
                             (they still need help, so we keep it as fall)
     
     Non-fall videos: all frames → label 0
-    """
-    frame_labels = [0] * total_frames
 
+    NOTE: the 30/40/30 split above is not applied — every frame of a fall
+    video is labelled 1, which is what the shipped model was trained on.
+    Returns an int8 np.ndarray of length total_frames.
+    """
     if is_fall_video:
-        fall_start = int(total_frames * 0.30)
-        fall_end   = int(total_frames * 0.70)
-        for i in range(0, total_frames):  # middle + lying still = label 1
-            frame_labels[i] = 1
-
-    return frame_labels
+        return np.ones(total_frames, dtype=np.int8)
+    return np.zeros(total_frames, dtype=np.int8)
 
 
 # ---- Video processing ----------------------------------------------------
 
 def process_video(video_path, is_fall_video, dataset_name, estimator, engineer):
-    rows = []
-
-    cap = cv2.VideoCapture(str(video_path))
+    """
+    Extract every full window from one video.
+    Returns a pyarrow Table matching SCHEMA, or None if the video can't be
+    opened or fails the pose quality filter.
+    """
+    # FFmpeg backend with hardware decoding where available (OpenCV falls
+    # back to software on its own); plain default backend if that won't open
+    cap = cv2.VideoCapture(str(video_path), cv2.CAP_FFMPEG,
+                           [cv2.CAP_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY])
+    if not cap.isOpened():
+        cap = cv2.VideoCapture(str(video_path))
     if not cap.isOpened():
         print(f"  WARNING: Could not open {video_path}")
-        return rows
+        return None
 
     # Count total frames upfront so we can build the label array
     total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
@@ -68,26 +89,44 @@ def process_video(video_path, is_fall_video, dataset_name, estimator, engineer):
     # Get per-frame labels for this entire video before processing
     frame_labels = get_frame_labels_le2i(total_frames, is_fall_video)
 
+    cache_path = POSE_CACHE_DIR / dataset_name / video_path.parent.name / f"{video_path.name}.npy"
+    poses = _cached_poses(cache_path, video_path)
+    if poses is None:
+        poses = _estimate_poses(cap, estimator, cache_path)
+    else:
+        cap.release()
+
+    # Window outputs, preallocated for the frame count and filled in place:
+    # one contiguous float32 row per feature column, handed to Arrow as-is
+    capacity   = max(total_frames - WINDOW_SIZE + 1, 0)
+    features   = np.empty((len(FEATURE_COLS), capacity), dtype=np.float32)
+    end_frames = np.empty(capacity, dtype=np.int32)
+    labels     = np.empty(capacity, dtype=np.int8)
+    n_windows  = 0
+
     # Two parallel sliding windows:
     #   feature_window — built inside FeatureEngineer automatically
-    #   label_window   — we track here to label each window correctly
+    #   label window   — we track here to label each window correctly.
+    #                    A window is labeled 'fall' if MORE THAN HALF its
+    #                    frames are fall frames, so a window that merely clips
+    #                    the edge of a fall isn't labeled as one. The fall
+    #                    count is kept as a running sum, updated on each
+    #                    append/evict instead of re-summed every frame.
     label_window_buffer = deque(maxlen=WINDOW_SIZE)
+    window_fall_count   = 0
 
     frame_idx          = 0
     frames_with_pose   = 0
-    windows_extracted  = 0
-
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            break
 
+    for landmarks in poses:
         # Get this frame's label and add to label window
-        current_label = frame_labels[frame_idx] if frame_idx < len(frame_labels) else 0
+        current_label = int(frame_labels[frame_idx]) if frame_idx < len(frame_labels) else 0
+        if len(label_window_buffer) == WINDOW_SIZE:
+            window_fall_count -= label_window_buffer[0]   # evicted by the append
         label_window_buffer.append(current_label)
+        window_fall_count += current_label
 
-        # Run pose estimation and feature extraction
-        landmarks, _  = estimator.process_frame(frame)
+        # Feature extraction on this frame's pose
         flat_features = engineer.compute(landmarks)
 
         if landmarks is not None:
@@ -95,24 +134,19 @@ def process_video(video_path, is_fall_video, dataset_name, estimator, engineer):
 
         # Only emit a row when the feature window is full (returns non-None)
         if flat_features is not None and len(label_window_buffer) == WINDOW_SIZE:
-            window_label = label_window(list(label_window_buffer))
-
-            row = {
-                'dataset':          dataset_name,
-                'video':            video_path.name,
-                'window_end_frame': frame_idx,
-                'label':            window_label,
-            }
-            for col, val in zip(FEATURE_COLS, flat_features):
-                row[col] = val
-
-            rows.append(row)
-            windows_extracted += 1
+            if n_windows == capacity:
+                # FRAME_COUNT comes from the container and can undercount
+                capacity   = max(2 * capacity, WINDOW_SIZE)
+                features   = _grow(features, capacity)
+                end_frames = _grow(end_frames, capacity)
+                labels     = _grow(labels, capacity)
+            features[:, n_windows] = flat_features
+            end_frames[n_windows]  = frame_idx
+            labels[n_windows]      = window_fall_count * 2 > WINDOW_SIZE
+            n_windows += 1
 
         frame_idx += 1
 
-    cap.release()
-
     # ---- Pose quality filter (same as your original) ---------------------
     pose_rate = frames_with_pose / max(frame_idx, 1)
     pose_pct  = pose_rate * 100
@@ -120,22 +154,130 @@ def process_video(video_path, is_fall_video, dataset_name, estimator, engineer):
     if pose_rate < MIN_POSE_RATE:
         print(f"    SKIPPED {video_path.name}: {frame_idx} frames, "
               f"pose only {pose_pct:.0f}% (below {MIN_POSE_RATE*100:.0f}% threshold)")
-        return []
+        return None
 
-    fall_windows = sum(1 for r in rows if r['label'] == 1)
+    windows_extracted = n_windows
+    fall_windows      = int(np.count_nonzero(labels[:n_windows]))
     print(f"    {video_path.name}: {frame_idx} frames → "
           f"{windows_extracted} windows "
           f"({fall_windows} fall, {windows_extracted - fall_windows} non-fall) "
           f"| pose {pose_pct:.0f}%")
-    return rows
+
+    return pa.Table.from_arrays(
+        [pa.array([dataset_name] * windows_extracted, pa.string()),
+         pa.array([video_path.name] * windows_extracted, pa.string()),
+         pa.array(end_frames[:n_windows]),
+         pa.array(labels[:n_windows])]
+        + [pa.array(col) for col in features[:, :n_windows]],
+        schema=SCHEMA,
+    )
+
+
+def _grow(arr, capacity):
+    """Copy of arr with its last axis extended to capacity."""
+    out = np.empty(arr.shape[:-1] + (capacity,), dtype=arr.dtype)
+    out[..., :arr.shape[-1]] = arr
+    return out
+
+
+# ---- Pose cache ----------------------------------------------------------
+
+def _read_frames(cap, frames):
+    """Reader thread: decodes every frame of cap into frames, then puts None."""
+    while True:
+        ret, frame = cap.read()
+        frames.put(frame if ret else None)
+        if not ret:
+            break
+
+
+def _estimate_poses(cap, estimator, cache_path):
+    """
+    Yields estimator.process_frame() for every frame of cap, then releases
+    cap and saves the whole sequence to cache_path.
+
+    Frames are decoded on a reader thread up to READ_AHEAD frames ahead, so
+    decoding overlaps MediaPipe (both release the GIL) instead of alternating
+    with it.
+    """
+    frames = queue.Queue(maxsize=READ_AHEAD)
+    reader = threading.Thread(target=_read_frames, args=(cap, frames), daemon=True)
+    reader.start()
+
+    poses = []
+    while True:
+        frame = frames.get()
+        if frame is None:
+            break
+        landmarks = estimator.process_frame(frame)
+        poses.append(landmarks)
+        yield landmarks
+    reader.join()
+    cap.release()
+
+    cached = np.full((len(poses), 33, 4), np.nan, dtype=np.float32)
+    for i, landmarks in enumerate(poses):
+        if landmarks is not None:
+            cached[i] = landmarks
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    # Written under a temporary name so an interrupted run can't leave a
+    # truncated cache behind
+    tmp_path = cache_path.with_suffix('.tmp.npy')
+    np.save(tmp_path, cached)
+    tmp_path.replace(cache_path)
+
+
+def _cached_poses(cache_path, video_path):
+    """
+    Per-frame landmarks ([33, 4] float32 or None) from cache_path, or None if
+    there is no cache or it is older than the video.
+    """
+    if not cache_path.exists() or cache_path.stat().st_mtime < video_path.stat().st_mtime:
+        return None
+    cached = np.load(cache_path)
+    valid  = ~np.isnan(cached[:, 0, 0])
+    return [frame if ok else None for frame, ok in zip(cached, valid.tolist())]
+
+
+# ---- Worker --------------------------------------------------------------
+
+_worker = None   # (PoseEstimator, FeatureEngineer), built once per process
+
+
+def _extract_video(job):
+    """Run process_video in whichever process this is, on its own estimator."""
+    global _worker
+    if _worker is None:
+        _worker = (PoseEstimator(), FeatureEngineer(window_size=WINDOW_SIZE))
+    estimator, engineer = _worker
+    engineer.reset()
+    video_path, is_fall, dataset_name = job
+    return process_video(video_path, is_fall, dataset_name, estimator, engineer)
 
 
 # ---- Main ----------------------------------------------------------------
 
-def extract_all():
-    estimator = PoseEstimator()
-    engineer  = FeatureEngineer(window_size=WINDOW_SIZE)
-    all_rows  = []
+def extract_all(max_workers=None):
+    """
+    max_workers: videos processed in parallel, one process each. Defaults to
+                 half the CPU count — each MediaPipe graph runs its own
+                 threads too. 1 processes everything in this process.
+    """
+    if max_workers is None:
+        max_workers = max(1, (os.cpu_count() or 2) // 2)
+
+    # MediaPipe graphs aren't fork-safe — workers are spawned fresh
+    pool = None
+    if max_workers > 1:
+        pool = ProcessPoolExecutor(max_workers=max_workers, mp_context=mp.get_context('spawn'))
+    run = pool.map if pool is not None else map
+
+    # Written under a temporary name and renamed once complete, so an
+    # interrupted run never leaves a partial file for load_features()
+    partial_path = FEATURES_PATH.with_suffix('.parquet.partial')
+    writer      = None
+    total_rows  = 0
+    fall_rows   = 0
 
     for dataset_name, base_path in DATASETS.items():
         print(f"\nProcessing dataset: {dataset_name}")
@@ -151,44 +293,51 @@ def extract_all():
                 print(f"  Skipping missing folder: {video_dir}")
                 continue
 
-            video_files = (list(video_dir.glob('*.mp4')) +
-                           list(video_dir.glob('*.avi')) +
-                           list(video_dir.glob('*.mov')))
+            # One directory listing, filtered by extension
+            with os.scandir(video_dir) as entries:
+                video_files = sorted(
+                    Path(entry.path) for entry in entries
+                    if entry.is_file() and os.path.splitext(entry.name)[1].lower() in VIDEO_EXTS
+                )
 
             print(f"  {label_str}: found {len(video_files)} videos")
 
             skipped = 0
-            for video_path in sorted(video_files):
-                engineer.reset()
-                rows = process_video(video_path, is_fall, dataset_name, estimator, engineer)
-                if not rows:
+            jobs = [(video_path, is_fall, dataset_name) for video_path in video_files]
+            # Results come back in job order, so the file is laid out the
+            # same whatever the worker count
+            for table in run(_extract_video, jobs):
+                if table is None or table.num_rows == 0:
                     skipped += 1
-                all_rows.extend(rows)
+                    continue
+
+                if writer is None:
+                    FEATURES_PATH.parent.mkdir(parents=True, exist_ok=True)
+                    writer = pq.ParquetWriter(partial_path, SCHEMA, compression='zstd')
+                writer.write_table(table)
+                total_rows += table.num_rows
+                fall_rows  += int(np.count_nonzero(table['label'].to_numpy()))
 
             if skipped:
                 print(f"  {label_str}: skipped {skipped} low-quality videos")
 
-    estimator.close()
+    if pool is not None:
+        pool.shutdown()
+    elif _worker is not None:
+        _worker[0].close()
 
-    if not all_rows:
+    if writer is None:
         print("\nERROR: No data extracted. Check dataset paths and video formats.")
         return
 
-    # ---- Write CSV -------------------------------------------------------
-    OUTPUT_CSV.parent.mkdir(parents=True, exist_ok=True)
-    fieldnames = ['dataset', 'video', 'window_end_frame', 'label'] + FEATURE_COLS
-
-    with open(OUTPUT_CSV, 'w', newline='') as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(all_rows)
+    writer.close()
+    partial_path.replace(FEATURES_PATH)
 
-    fall_rows     = sum(1 for r in all_rows if r['label'] == 1)
-    non_fall_rows = len(all_rows) - fall_rows
-    print(f"\nDone. Saved {len(all_rows)} total windows to {OUTPUT_CSV}")
+    non_fall_rows = total_rows - fall_rows
+    print(f"\nDone. Saved {total_rows} total windows to {FEATURES_PATH}")
     print(f"  Fall windows:     {fall_rows}")
     print(f"  Non-fall windows: {non_fall_rows}")
-    print(f"  Fall percentage:  {fall_rows / len(all_rows) * 100:.1f}%")
+    print(f"  Fall percentage:  {fall_rows / total_rows * 100:.1f}%")
 
 
 if __name__ == '__main__':
@@ -25,7 +25,9 @@ Usage:
 """
 
 import cv2
+import shutil
 import argparse
+import subprocess
 from pathlib import Path
 
 
@@ -36,6 +38,12 @@ FALL_PADDING = 15
 # Minimum clip length in frames — clips shorter than this are skipped
 MIN_CLIP_FRAMES = 10
 
+# ffmpeg stream-copies clips without decoding or re-encoding a frame, but
+# only clips that start on a keyframe (found with ffprobe) — any other clip,
+# or every clip without ffmpeg, is decoded through OpenCV and re-encoded as XVID
+FFMPEG  = shutil.which('ffmpeg')
+FFPROBE = shutil.which('ffprobe')
+
 
 def parse_annotation(txt_path):
     """
@@ -46,24 +54,73 @@ def parse_annotation(txt_path):
     Example first line: "48 80"
     """
     try:
-        text = txt_path.read_text().strip()
         # Format: "48 80 1,1,0,0,0,0 2,1,0,0,0,0 ..."
-        # First two space-separated tokens are always fall_start and fall_end
-        tokens = text.split()
-        return int(tokens[0]), int(tokens[1])
+        # First two space-separated tokens are always fall_start and fall_end,
+        # so only the head of the file is read — the per-frame rows are skipped
+        with open(txt_path, 'rb') as f:
+            head = f.read(64)
+        start, end = head.split(None, 2)[:2]
+        return int(start), int(end)
     except Exception as e:
         print(f"    WARNING: Could not parse {txt_path.name}: {e}")
         return None, None
 
 
-def write_clip(cap, out_path, start_frame, end_frame, fps, width, height):
+def keyframe_indices(src_path, fps):
+    """
+    Returns the frame indices of src_path's video keyframes as a frozenset,
+    or an empty set if ffprobe is unavailable or fails. Only packet
+    timestamps and flags are read — nothing is decoded.
+    """
+    if not FFPROBE:
+        return frozenset()
+    result = subprocess.run(
+        [FFPROBE, '-v', 'error', '-select_streams', 'v:0',
+         '-show_entries', 'packet=pts_time,flags', '-of', 'csv=p=0', str(src_path)],
+        capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        return frozenset()
+    # One "pts_time,flags" line per video packet; 'K' marks a keyframe
+    keyframes = set()
+    for line in result.stdout.split():
+        pts_time, _, flags = line.partition(',')
+        if 'K' in flags and pts_time != 'N/A':
+            keyframes.add(round(float(pts_time) * fps))
+    return frozenset(keyframes)
+
+
+def write_clip(cap, out_path, start_frame, end_frame, fps, width, height,
+               src_path=None, keyframes=frozenset()):
     """
     Extracts frames [start_frame, end_frame] from cap and writes to out_path.
     Returns True if clip was written successfully.
+
+    With ffmpeg on PATH and src_path given, a clip that starts at frame 0 or
+    on one of `keyframes` (see keyframe_indices) is stream-copied from
+    src_path instead. Stream copy can only start on a keyframe — from any
+    other frame it would pull in the rest of the previous GOP, i.e. frames
+    from the neighbouring (differently labelled) clip — so those clips are
+    always re-encoded frame-exactly.
     """
     if end_frame - start_frame < MIN_CLIP_FRAMES:
         return False
 
+    if FFMPEG and src_path is not None and (start_frame == 0 or start_frame in keyframes):
+        # Seek half a frame past the keyframe so rounding can't land on the
+        # one before it; the copy starts at the keyframe itself and
+        # -frames:v stops after exactly end_frame - start_frame frames
+        result = subprocess.run(
+            [FFMPEG, '-y', '-loglevel', 'error',
+             '-ss', f'{(start_frame + 0.5) / fps:.6f}', '-i', str(src_path),
+             '-frames:v', str(end_frame - start_frame),
+             '-c', 'copy', '-an', str(out_path)],
+            capture_output=True, text=True,
+        )
+        if result.returncode == 0:
+            return True
+        print(f"    WARNING: ffmpeg failed on {Path(src_path).name}, re-encoding: {result.stderr.strip()}")
+
     fourcc = cv2.VideoWriter_fourcc(*'XVID')
     out = cv2.VideoWriter(str(out_path), fourcc, fps, (width, height))
 
@@ -127,7 +184,12 @@ def process_scene(scene_path, output_fall, output_nonfail):
         if fall_start is None:
             continue
 
-        cap = cv2.VideoCapture(str(video_path))
+        # FFmpeg backend with hardware decoding where available (OpenCV falls
+        # back to software on its own); plain default backend if that won't open
+        cap = cv2.VideoCapture(str(video_path), cv2.CAP_FFMPEG,
+                               [cv2.CAP_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY])
+        if not cap.isOpened():
+            cap = cv2.VideoCapture(str(video_path))
         if not cap.isOpened():
             print(f"    WARNING: Could not open {video_path.name}")
             continue
@@ -141,27 +203,30 @@ def process_scene(scene_path, output_fall, output_nonfail):
         clip_start = max(0, fall_start - FALL_PADDING)
         clip_end   = min(total, fall_end + FALL_PADDING)
 
+        # Only needed to decide which clips can be stream-copied
+        keyframes = keyframe_indices(video_path, fps) if FFMPEG else frozenset()
+
         # Build output filename base
         scene_tag  = scene_path.name          # e.g. Coffee_room_01
         video_tag  = video_name.replace(' ', '_').replace('(', '').replace(')', '')
 
         # --- Fall clip ---
         fall_out = output_fall / f"{scene_tag}_{video_tag}_fall.avi"
-        if write_clip(cap, fall_out, clip_start, clip_end, fps, width, height):
+        if write_clip(cap, fall_out, clip_start, clip_end, fps, width, height, video_path, keyframes):
             fall_count += 1
 
         # --- Non-fall clip: frames BEFORE the fall ---
         before_end = max(0, fall_start - FALL_PADDING)
         if before_end > MIN_CLIP_FRAMES:
             before_out = output_nonfail / f"{scene_tag}_{video_tag}_before.avi"
-            write_clip(cap, before_out, 0, before_end, fps, width, height)
+            write_clip(cap, before_out, 0, before_end, fps, width, height, video_path, keyframes)
             nonfail_count += 1
 
         # --- Non-fall clip: frames AFTER the fall ---
         after_start = min(total, fall_end + FALL_PADDING)
         if total - after_start > MIN_CLIP_FRAMES:
             after_out = output_nonfail / f"{scene_tag}_{video_tag}_after.avi"
-            write_clip(cap, after_out, after_start, total, fps, width, height)
+            write_clip(cap, after_out, after_start, total, fps, width, height, video_path, keyframes)
             nonfail_count += 1
 
         cap.release()
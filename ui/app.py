@@ -17,7 +17,12 @@ Usage
 
 from __future__ import annotations
 
+import queue
+import threading
 import tkinter as tk
+from collections import deque
+from datetime import datetime
+from pathlib import Path
 from tkinter import font as tkfont
 from typing import Type
 
@@ -62,6 +67,10 @@ PADDING = {
     "item":     8,   # between items within a section
 }
 
+# Event log — always next to config.json in the project root, regardless
+# of the working directory when the app is launched.
+_LOG_FILE = Path(__file__).resolve().parent.parent / "event_log.jsonl"
+
 
 # ---------------------------------------------------------------------------
 # App
@@ -90,8 +99,16 @@ class App(tk.Tk):
         y = (self.winfo_screenheight() - 700) // 2
         self.geometry(f"960x700+{x}+{y}")
 
+        # Named Tk fonts for FONTS, built once. Passing one of these as font=
+        # is a lookup in Tk's font table; a tuple is re-parsed into a font
+        # on every configure. Screens keep using FONTS where they derive
+        # variants (bold, scaled sizes) from the tuples.
+        self.fonts: dict[str, tkfont.Font] = {
+            name: tkfont.Font(root=self, font=spec) for name, spec in FONTS.items()
+        }
+
         # --- Navigation bar ---
-        self._nav = _NavBar(self, on_navigate=self._on_nav)
+        self._nav = _NavBar(self, on_navigate=self._on_nav, font=self.fonts["nav"])
         self._nav.pack(side=tk.TOP, fill=tk.X)
         # Bottom border on nav
         tk.Frame(self, bg=COLORS["border"], height=2).pack(side=tk.TOP, fill=tk.X)
@@ -105,9 +122,27 @@ class App(tk.Tk):
         self._screens: dict[str, tk.Frame] = {}
         self._current_screen: str | None = None
 
-        # Shared event log — written by MonitoringScreen, read by EventLogScreen
-        # Each entry: {"time": str, "type": "fall"|"near_fall"|"assessment", "detail": str}
-        self.event_log: list[dict] = self._load_event_log()
+        # Shared event log — written by MonitoringScreen, read by EventLogScreen.
+        # Read from disk on first use of the event_log property, not here.
+        # Holds the newest MAX_EVENTS entries; older ones are moved to
+        # ARCHIVE_FILE (via _evicted) the next time LOG_FILE is rewritten.
+        self._event_log: deque[dict] | None = None
+        self._evicted: list[dict] = []
+
+        # Each event is appended to LOG_FILE as it's logged, on the writer
+        # thread — log_event only queues a line and the UI thread never waits
+        # on the disk. The file is only rewritten on close if entries were
+        # changed, removed or evicted (see update_event / clear_event_log).
+        self._log_dirty = False
+        self._log_q: queue.Queue[str | None] = queue.Queue()
+        self._writer = threading.Thread(target=self._writer_loop, daemon=True)
+        self._writer.start()
+
+        # Logged entries waiting to be shown on EventLogScreen. post_event()
+        # queues them from any thread and wakes the Tk loop with a virtual
+        # event; _drain_events then renders them on the Tk thread.
+        self._ui_event_q: queue.Queue[dict] = queue.Queue()
+        self.bind("<<FallLogEvent>>", self._drain_events)
 
         # Start on the setup screen
         self.show_screen("setup")
@@ -119,42 +154,160 @@ class App(tk.Tk):
         monitor = self._screens.get("monitoring")
         if monitor is not None:
             monitor.on_close()
-        self._save_event_log()
+        # The writer finishes LOG_FILE once it has drained the queue
+        self._log_q.put(None)
+        self._writer.join(timeout=1.0)
         self.destroy()
 
     # -----------------------------------------------------------------------
     # Event log persistence
     # -----------------------------------------------------------------------
 
-    # Always save next to config.json in the project root,
-    # regardless of the working directory when the app is launched.
-    LOG_FILE = str(__import__("pathlib").Path(__file__).parent.parent / "event_log.json")
+    # JSON Lines — one event per line, appended as events are logged.
+    LOG_FILE = _LOG_FILE
+    # JSON array written on close by earlier versions; migrated into LOG_FILE
+    LEGACY_LOG_FILE = _LOG_FILE.with_suffix(".json")
+    # Entries pushed out of the in-memory log, oldest first
+    ARCHIVE_FILE = _LOG_FILE.with_name("event_log.archive.jsonl")
+
+    # Most events kept in memory (and in LOG_FILE once it is rewritten)
+    MAX_EVENTS = 5000
 
-    def _load_event_log(self) -> list[dict]:
-        """Read persisted event log from disk. Returns empty list if not found."""
+    # Most queued events the writer appends per write + flush
+    WRITE_BATCH = 64
+
+    def _load_event_log(self) -> deque[dict]:
+        """
+        Read persisted event log from disk: LEGACY_LOG_FILE if one is still
+        around, then LOG_FILE. Returns the newest MAX_EVENTS entries (empty
+        if neither file exists); any older ones are queued for the archive.
+        """
         import json, os
-        if not os.path.exists(self.LOG_FILE):
-            return []
-        try:
-            with open(self.LOG_FILE) as f:
-                data = json.load(f)
-            return data if isinstance(data, list) else []
-        except Exception:
-            return []
+        events: list[dict] = []
+        if os.path.exists(self.LEGACY_LOG_FILE):
+            try:
+                with open(self.LEGACY_LOG_FILE) as f:
+                    data = json.load(f)
+                if isinstance(data, list):
+                    events = data
+            except Exception:
+                pass
+            # Rewritten as JSON Lines on close
+            self._log_dirty = True
+        if os.path.exists(self.LOG_FILE):
+            try:
+                with open(self.LOG_FILE) as f:
+                    for line in f:
+                        if not line.strip():
+                            continue
+                        try:
+                            events.append(json.loads(line))
+                        except ValueError:
+                            pass  # line cut short by a crash mid-write
+            except Exception:
+                pass
+        if len(events) > self.MAX_EVENTS:
+            # Archived and dropped from LOG_FILE on close
+            self._evicted.extend(events[:-self.MAX_EVENTS])
+            self._log_dirty = True
+        return deque(events, maxlen=self.MAX_EVENTS)
 
     def _save_event_log(self) -> None:
-        """Write the current event log to disk."""
-        import json
+        """
+        Rewrite LOG_FILE from the in-memory log. Only needed when entries were
+        changed, removed or evicted — appends are already on disk. Evicted
+        entries are appended to ARCHIVE_FILE first, so none are lost.
+        """
+        import json, os
+        if self._event_log is None or not self._log_dirty:
+            return
         try:
-            with open(self.LOG_FILE, "w") as f:
-                json.dump(self.event_log, f, indent=2)
+            if self._evicted:
+                with open(self.ARCHIVE_FILE, "a") as f:
+                    f.writelines(json.dumps(entry) + "\n" for entry in self._evicted)
+                self._evicted.clear()
+            tmp_path = self.LOG_FILE.with_name(self.LOG_FILE.name + ".tmp")
+            with open(tmp_path, "w") as f:
+                f.writelines(json.dumps(entry) + "\n" for entry in self._event_log)
+            os.replace(tmp_path, self.LOG_FILE)
+            # Only once LOG_FILE holds everything
+            if os.path.exists(self.LEGACY_LOG_FILE):
+                os.remove(self.LEGACY_LOG_FILE)
         except Exception:
             pass  # Don't crash on close if save fails
 
+    def _writer_loop(self) -> None:
+        """
+        Writer thread. Appends queued event lines to LOG_FILE — everything
+        queued since the last write goes out in one write + flush — and on the
+        None sentinel from _on_close rewrites LOG_FILE if needed and exits.
+        """
+        try:
+            log = open(self.LOG_FILE, "a+b")
+            if log.tell():
+                log.seek(-1, 2)
+                if log.read(1) != b"\n":
+                    # Last line cut short by a crash — start on a fresh one
+                    log.write(b"\n")
+        except OSError:
+            log = None
+
+        closing = False
+        while not closing:
+            lines = []
+            item = self._log_q.get()
+            while True:
+                if item is None:
+                    closing = True
+                    break
+                lines.append(item)
+                if len(lines) == self.WRITE_BATCH:
+                    break
+                try:
+                    item = self._log_q.get_nowait()
+                except queue.Empty:
+                    break
+
+            if not lines:
+                continue
+            try:
+                log.write("".join(lines).encode())
+                log.flush()
+            except Exception:   # including log is None — the open failed
+                # Still in memory — rewrite the whole file on close
+                self._log_dirty = True
+
+        if log is not None:
+            log.close()
+        self._save_event_log()
+
     # -----------------------------------------------------------------------
     # Public API
     # -----------------------------------------------------------------------
 
+    @property
+    def event_log(self) -> deque[dict]:
+        """
+        The shared event log (newest MAX_EVENTS entries), loaded from disk on
+        first access.
+        Each entry: {"time": str, "type": "fall"|"near_fall"|"assessment", "detail": str}
+        """
+        if self._event_log is None:
+            self._event_log = self._load_event_log()
+        return self._event_log
+
+    def update_event(self, entry: dict) -> None:
+        """
+        Record that an entry returned by log_event() was changed in place
+        (e.g. a clip_path added), so LOG_FILE is rewritten on close.
+        """
+        self._log_dirty = True
+
+    def clear_event_log(self) -> None:
+        """Remove every event, in memory and (on close) on disk."""
+        self.event_log.clear()
+        self._log_dirty = True
+
     def show_screen(self, name: str) -> None:
         """
         Navigate to a screen by name.
@@ -190,40 +343,75 @@ class App(tk.Tk):
         detail : str
             Human-readable description of the event.
         """
-        from datetime import datetime
         entry = {
-            "time":   datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            # "YYYY-MM-DD HH:MM:SS" — same text as strftime, without parsing a format
+            "time":   datetime.now().isoformat(" ", "seconds"),
             "type":   event_type,
             "detail": detail,
         }
-        self.event_log.append(entry)
+        log = self.event_log
+        if len(log) == log.maxlen:
+            # append() below pushes the oldest entry out
+            self._evicted.append(log[0])
+            self._log_dirty = True
+        log.append(entry)
+        # Serialised here, not on the writer, so a later in-place update of
+        # entry (e.g. clip_path) can't race with json.dumps
+        import json
+        self._log_q.put(json.dumps(entry) + "\n")
 
         # Live-push to event log screen if it's already instantiated
-        log_screen = self._screens.get("log")
-        if log_screen is not None:
-            log_screen.push_event(entry)
+        if "log" in self._screens:
+            self.post_event(entry)
 
         # Return the entry so callers can mutate it later (e.g. add clip_path)
         return entry
 
+    def post_event(self, entry: dict) -> None:
+        """
+        Hand an entry to EventLogScreen from any thread.
+
+        The entry is queued and a <<FallLogEvent>> virtual event is added to
+        the tail of Tk's event queue, so the main loop wakes exactly once per
+        event and renders it on the Tk thread — no polling with after().
+        """
+        self._ui_event_q.put(entry)
+        try:
+            self.event_generate("<<FallLogEvent>>", when="tail")
+        except tk.TclError:
+            pass  # window already destroyed — nothing left to render into
+
+    def _drain_events(self, _event: tk.Event) -> None:
+        """<<FallLogEvent>> handler: render every queued entry."""
+        log_screen = self._screens.get("log")
+        while True:
+            try:
+                entry = self._ui_event_q.get_nowait()
+            except queue.Empty:
+                return
+            if log_screen is not None:
+                log_screen.push_event(entry)
+
     # -----------------------------------------------------------------------
     # Internal
     # -----------------------------------------------------------------------
 
+    # Screen name -> (module, class). Imported on first visit, not at module
+    # load time, to avoid circular imports (the screens import from ui.app)
+    _SCREEN_CLASSES = {
+        "setup":      ("ui.setup_screen",      "SetupScreen"),
+        "monitoring": ("ui.monitoring_screen", "MonitoringScreen"),
+        "log":        ("ui.event_log_screen",  "EventLogScreen"),
+    }
+
     def _build_screen(self, name: str) -> tk.Frame:
         """Instantiate and grid a screen frame inside the container."""
-        # Import here to avoid circular imports at module load time
-        if name == "setup":
-            from ui.setup_screen import SetupScreen
-            screen = SetupScreen(self._container, app=self)
-        elif name == "monitoring":
-            from ui.monitoring_screen import MonitoringScreen
-            screen = MonitoringScreen(self._container, app=self)
-        elif name == "log":
-            from ui.event_log_screen import EventLogScreen
-            screen = EventLogScreen(self._container, app=self)
-        else:
-            raise ValueError(f"Unknown screen name: '{name}'")
+        import importlib
+        try:
+            module, cls = self._SCREEN_CLASSES[name]
+        except KeyError:
+            raise ValueError(f"Unknown screen name: '{name}'") from None
+        screen = getattr(importlib.import_module(module), cls)(self._container, app=self)
 
         screen.grid(row=0, column=0, sticky="nsew")
         return screen
@@ -247,11 +435,12 @@ class _NavBar(tk.Frame):
         ("log",        "≡  Event Log"),
     ]
 
-    def __init__(self, parent: tk.Widget, on_navigate):
+    def __init__(self, parent: tk.Widget, on_navigate, font: tkfont.Font):
         super().__init__(parent, bg=COLORS["surface"], height=72, relief=tk.FLAT)
         self.pack_propagate(False)
         self._on_navigate = on_navigate
         self._buttons: dict[str, tk.Label] = {}
+        self._active: str | None = None
 
         # App title
         tk.Label(
@@ -259,7 +448,7 @@ class _NavBar(tk.Frame):
             text="Fall Detection System",
             bg=COLORS["surface"],
             fg=COLORS["text_primary"],
-            font=FONTS["nav"],
+            font=font,
             padx=24,
         ).pack(side=tk.LEFT)
 
@@ -275,7 +464,7 @@ class _NavBar(tk.Frame):
                 text=label,
                 bg=COLORS["surface"],
                 fg=COLORS["text_secondary"],
-                font=FONTS["nav"],
+                font=font,
                 padx=20,
                 pady=4,
                 cursor="hand2",
@@ -288,19 +477,20 @@ class _NavBar(tk.Frame):
 
     def set_active(self, name: str) -> None:
         """Highlight the active screen's nav button."""
-        for n, btn in self._buttons.items():
-            if n == name:
-                btn.configure(fg=COLORS["accent"], font=FONTS["nav"])
-            else:
-                btn.configure(fg=COLORS["text_secondary"], font=FONTS["nav"])
+        if name == self._active:
+            return
+        # Only the outgoing and incoming buttons change colour; the font is
+        # the same for every state, so it is never reconfigured
+        if self._active in self._buttons:
+            self._buttons[self._active].configure(fg=COLORS["text_secondary"])
+        if name in self._buttons:
+            self._buttons[name].configure(fg=COLORS["accent"])
+        self._active = name
 
     def _restore(self, btn: tk.Label, name: str) -> None:
-        if self._buttons.get(name) == btn:
-            is_active = any(
-                n == name and btn.cget("font") == str(FONTS["label_bold"])
-                for n, _ in self._SCREENS
-            )
-            btn.configure(fg=COLORS["accent"] if btn.cget("fg") == COLORS["accent"] else COLORS["text_secondary"])
+        # <Enter> has already replaced fg with the hover colour, so go by the
+        # name set_active recorded rather than reading fg back from Tk
+        btn.configure(fg=COLORS["accent"] if name == self._active else COLORS["text_secondary"])
 
 
 # ---------------------------------------------------------------------------
@@ -5,7 +5,7 @@ Scrollable event log screen for the fall detection system.
 
 Shows a chronological list of all falls, near-falls, assessment outcomes,
 and system info messages. New events are pushed live from the monitoring
-screen via app.log_event() -> push_event().
+screen via app.log_event() -> app.post_event() -> push_event().
 
 Entry types and their visual treatment:
     fall        — red left border, bold label
@@ -74,7 +74,8 @@ class EventLogScreen(tk.Frame):
     On first display, back-fills from app.event_log so events that happened
     before this screen was first visited are still shown.
 
-    New events are pushed live by app.log_event() calling push_event().
+    New events are pushed live by app.log_event(); app.post_event() wakes
+    the Tk loop and push_event() is called from there.
     """
 
     def __init__(self, parent: tk.Widget, app: "App"):
@@ -187,11 +188,11 @@ class EventLogScreen(tk.Frame):
     def push_event(self, entry: dict) -> None:
         """
         Append a single event entry to the log.
-        Safe to call from any thread via app.log_event() → self.after().
+        Tk thread only — other threads go through app.post_event().
 
         entry keys: time (str), type (str), detail (str)
         """
-        self.after(0, lambda: self._add_row(entry))
+        self._add_row(entry)
 
     # -----------------------------------------------------------------------
     # Row rendering
@@ -373,8 +374,8 @@ class EventLogScreen(tk.Frame):
             widget.destroy()
         self._entry_count = 0
         self._update_count_label()
-        # Also clear the in-memory log so it doesn't get re-saved on close
-        self._app.event_log.clear()
+        # Also clear the app's log, in memory and on disk
+        self._app.clear_event_log()
         # Restore empty state label
         self._empty_label = tk.Label(
             self._list_frame,
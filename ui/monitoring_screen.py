@@ -97,11 +97,17 @@ class MonitoringScreen(tk.Frame):
         self._pipeline     = None
         self._thread       = None
         self._frame_queue: queue.Queue[FrameResult | None] = queue.Queue(maxsize=2)
-        # Clip paths produced by the capture thread — drained safely on main thread
+        # Paths of clips EventLogger has finished writing (reported on its
+        # writer thread) — drained safely on main thread
         self._clip_queue: queue.Queue[str] = queue.Queue()
         self._last_fall_time: float = 0.0   # debounce — prevent re-triggering
         self._fall_cooldown = 30.0           # seconds before a new fall can trigger
 
+        # Preview buffers — reused every frame (see _draw_skeleton)
+        self._preview_bgr  = None
+        self._preview_rgb  = None
+        self._preview_item = None   # canvas image item, updated in place
+
         # Overlay state
         self._overlay_visible = False
         self._last_result: AssessmentResult | None = None
@@ -241,9 +247,23 @@ class MonitoringScreen(tk.Frame):
             self._set_badge("stopped")
             self._rf_label.configure(text="Camera error")
             return
-
-        self._pipeline     = DetectionPipeline(draw_skeleton=True, show_debug_rules=False)
-        self._event_logger = EventLogger()
+        # Ask for compressed MJPEG at canvas resolution (less USB bandwidth
+        # and decode work than raw YUYV at the camera's native size) and a
+        # one-frame driver buffer so reads return the newest frame rather
+        # than a stale queued one. Cameras that don't support a property
+        # simply ignore it.
+        self._cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*"MJPG"))
+        self._cap.set(cv2.CAP_PROP_FRAME_WIDTH,  CANVAS_W)
+        self._cap.set(cv2.CAP_PROP_FRAME_HEIGHT, CANVAS_H)
+        self._cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+
+        self._pipeline     = DetectionPipeline(
+            draw_skeleton=True, show_debug_rules=False,
+            render_mode='never',   # the skeleton is drawn onto a blank frame below
+        )
+        # Do NOT call self.after() from on_saved — it runs on the writer
+        # thread. The path goes in a queue; _poll() drains it on the main thread.
+        self._event_logger = EventLogger(on_saved=lambda path: self._clip_queue.put_nowait(str(path)))
         self._running      = True
 
         self._start_btn.configure(
@@ -264,6 +284,13 @@ class MonitoringScreen(tk.Frame):
     def _stop_monitoring(self) -> None:
         self._running = False
 
+        # Let the capture thread see _running and exit before the camera,
+        # pipeline and clip recorder it uses are torn down. It only ever
+        # blocks on one frame read + one pipeline pass.
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
         if self._cap:
             self._cap.release()
             self._cap = None
@@ -274,6 +301,10 @@ class MonitoringScreen(tk.Frame):
 
         if self._event_logger:
             self._event_logger.reset()
+            # A clip queued just before Stop may still be encoding — wait for
+            # it off the Tk thread. Non-daemon, so quitting the app still lets
+            # the clip finish.
+            threading.Thread(target=self._event_logger.close).start()
             self._event_logger = None
 
         self._start_btn.configure(
@@ -320,12 +351,9 @@ class MonitoringScreen(tk.Frame):
 
             # Feed skeleton frame (not raw) to event logger so saved clips
             # only contain the skeleton, preserving privacy.
-            if self._event_logger:
-                clip_path = self._event_logger.add_frame(blank)
-                if clip_path:
-                    # Do NOT call self.after() here — this is a background thread.
-                    # Put the path in a queue; _poll() drains it on the main thread.
-                    self._clip_queue.put_nowait(str(clip_path))
+            event_logger = self._event_logger   # _stop_monitoring may clear it
+            if event_logger:
+                event_logger.add_frame(blank)
             result = result.__class__(
                 rf_status        = result.rf_status,
                 near_fall_status = result.near_fall_status,
@@ -492,6 +520,7 @@ class MonitoringScreen(tk.Frame):
         if self._pending_clip_entry is not None:
             self._pending_clip_entry["clip_path"] = clip_path
             self._pending_clip_entry["detail"] += f"  Clip saved: {clip_path}"
+            self._app.update_event(self._pending_clip_entry)
             # Notify the log screen to refresh that row
             log_screen = self._app.get_screen("log")
             if log_screen is not None:
@@ -621,19 +650,30 @@ class MonitoringScreen(tk.Frame):
         Convert the annotated BGR frame to a PhotoImage and display it on
         the canvas, scaled to fit CANVAS_W x CANVAS_H.
         """
-        frame_rgb = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB)
-        img       = Image.fromarray(frame_rgb).resize(
-            (CANVAS_W, CANVAS_H), Image.BILINEAR
+        # Scale first so the colour conversion only touches canvas-sized
+        # pixels; both steps write into buffers kept from the last frame.
+        self._preview_bgr = cv2.resize(
+            frame_bgr, (CANVAS_W, CANVAS_H), dst=self._preview_bgr,
+            interpolation=cv2.INTER_AREA,
+        )
+        self._preview_rgb = cv2.cvtColor(
+            self._preview_bgr, cv2.COLOR_BGR2RGB, dst=self._preview_rgb
         )
-        photo = ImageTk.PhotoImage(img)
+        photo = ImageTk.PhotoImage(Image.fromarray(self._preview_rgb))
 
         # Keep a reference — without this Tkinter garbage-collects the image
         self._photo_ref = photo
-        self._canvas.create_image(0, 0, anchor=tk.NW, image=photo)
+        # Swap the image on one canvas item rather than stacking a new item
+        # on the canvas every frame
+        if self._preview_item is None:
+            self._preview_item = self._canvas.create_image(0, 0, anchor=tk.NW, image=photo)
+        else:
+            self._canvas.itemconfigure(self._preview_item, image=photo)
 
     def _draw_idle_canvas(self) -> None:
         """Draw a placeholder message when monitoring is not running."""
         self._canvas.delete("all")
+        self._preview_item = None
         self._canvas.create_text(
             CANVAS_W // 2,
             CANVAS_H // 2,